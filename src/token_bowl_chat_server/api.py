@@ -34,6 +34,7 @@ from .models import (
     PublicUserProfile,
     Role,
     SendMessageRequest,
+    SendMessagesRequest,
     StytchAuthenticateRequest,
     StytchAuthenticateResponse,
     StytchLoginRequest,
@@ -246,22 +247,20 @@ async def authenticate_magic_link(
         ) from e
 
 
-@router.post("/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
-async def send_message(
-    message_request: SendMessageRequest,
-    current_user: User = Depends(get_current_user),
-) -> MessageResponse:
-    """Send a message to the room or as a direct message.
+def _build_message(
+    message_request: SendMessageRequest, current_user: User
+) -> tuple[Message, User | None]:
+    """Validate a send request and build the message it describes.
 
     Args:
         message_request: Message content and optional recipient
         current_user: Authenticated user
 
     Returns:
-        Created message
+        Tuple of (unsaved message, recipient or None for room messages)
 
     Raises:
-        HTTPException: If recipient doesn't exist
+        HTTPException: If the user lacks permission or the recipient is invalid
     """
     # Determine message type
     message_type = MessageType.DIRECT if message_request.to_username else MessageType.ROOM
@@ -295,32 +294,46 @@ async def send_message(
                 detail=f"Cannot send messages to viewer user {message_request.to_username}",
             )
 
-    # Create message
     message = Message(
         from_username=current_user.username,
         to_username=message_request.to_username,
         content=message_request.content,
         message_type=message_type,
     )
+    return message, recipient
 
-    # Store message
-    storage.add_message(message)
+
+async def _deliver_message(
+    message: Message, current_user: User, recipient: User | None
+) -> MessageResponse:
+    """Deliver a stored message via Centrifugo and webhooks.
+
+    The message is serialized once and the same payload goes to Centrifugo,
+    every webhook, and back to the sender.
+
+    Args:
+        message: Message that has already been stored
+        current_user: Sender of the message
+        recipient: Recipient for direct messages, None for room messages
+
+    Returns:
+        Response model for the message
+    """
+    response = MessageResponse.from_message(message, from_user=current_user, to_user=recipient)
+    message_data = response.model_dump(mode="json")
 
     logger.info(
         f"Message from {current_user.username} to "
-        f"{'room' if not message_request.to_username else message_request.to_username}"
+        f"{'room' if not message.to_username else message.to_username}"
     )
 
-    # Deliver message via Centrifugo and webhooks
-    from .centrifugo_client import get_centrifugo_client
-
     centrifugo = get_centrifugo_client()
 
-    if message_type == MessageType.ROOM:
+    if message.message_type == MessageType.ROOM:
         # Publish to Centrifugo
-        await centrifugo.publish_room_message(message, current_user)
+        await centrifugo.publish_room_message(message, current_user, message_data=message_data)
 
-        # Send via webhooks to all chat users who have webhook URLs configured
+        # Queue webhooks for all chat users who have webhook URLs configured
         # Viewers are excluded as they cannot receive direct messages
         chat_users = storage.get_chat_users()
         webhook_users = [
@@ -328,19 +341,81 @@ async def send_message(
             for user in chat_users
             if user.webhook_url and user.username != current_user.username
         ]
-        await webhook_delivery.broadcast_to_webhooks(message, webhook_users)
+        webhook_delivery.enqueue_broadcast(message, webhook_users, message_data=message_data)
 
     else:
         # Direct message - recipient was already fetched above for validation
         if recipient:
             # Publish to Centrifugo
-            await centrifugo.publish_direct_message(message, current_user, recipient)
+            await centrifugo.publish_direct_message(
+                message, current_user, recipient, message_data=message_data
+            )
 
-            # Always send via webhook if configured
+            # Always queue a webhook delivery if configured
             if recipient.webhook_url:
-                await webhook_delivery.deliver_message(recipient, message)
+                webhook_delivery.enqueue(recipient, message, message_data)
+
+    return response
+
+
+@router.post("/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
+async def send_message(
+    message_request: SendMessageRequest,
+    current_user: User = Depends(get_current_user),
+) -> MessageResponse:
+    """Send a message to the room or as a direct message.
+
+    Args:
+        message_request: Message content and optional recipient
+        current_user: Authenticated user
 
-    return MessageResponse.from_message(message, from_user=current_user, to_user=recipient)
+    Returns:
+        Created message
+
+    Raises:
+        HTTPException: If recipient doesn't exist
+    """
+    message, recipient = _build_message(message_request, current_user)
+
+    # Store message
+    storage.add_message(message)
+
+    # Deliver message via Centrifugo and webhooks
+    return await _deliver_message(message, current_user, recipient)
+
+
+@router.post(
+    "/messages/bulk",
+    response_model=list[MessageResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+async def send_messages(
+    messages_request: SendMessagesRequest,
+    current_user: User = Depends(get_current_user),
+) -> list[MessageResponse]:
+    """Send several messages in one request.
+
+    Every message is validated before any is stored, and all of them are
+    written in a single transaction.
+
+    Args:
+        messages_request: Messages to send, in order
+        current_user: Authenticated user
+
+    Returns:
+        Created messages, in request order
+
+    Raises:
+        HTTPException: If any message fails validation
+    """
+    built = [_build_message(request, current_user) for request in messages_request.messages]
+
+    # Store all messages at once
+    storage.add_messages([message for message, _ in built])
+
+    return [
+        await _deliver_message(message, current_user, recipient) for message, recipient in built
+    ]
 
 
 @router.get("/messages", response_model=PaginatedMessagesResponse)
@@ -6,12 +6,15 @@ from collections.abc import Callable
 from fastapi import Depends, Header, HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 
-from .models import Permission, User
+from .models import API_KEY_MAX_LENGTH, API_KEY_MIN_LENGTH, Permission, User
 from .storage import storage
 
 # API key header configuration
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# Stored API keys satisfy User.api_key's length bounds, so no other length can match
+_API_KEY_LENGTHS = range(API_KEY_MIN_LENGTH, API_KEY_MAX_LENGTH + 1)
+
 
 def generate_api_key() -> str:
     """Generate a secure random API key.
@@ -43,16 +46,18 @@ async def get_current_user(
         HTTPException: If authentication fails
     """
     # Try API key authentication first
-    if api_key:
+    if api_key and len(api_key) in _API_KEY_LENGTHS:
         user = storage.get_user_by_api_key(api_key)
         if user:
             return user
 
-    # Try Stytch session token authentication
-    if authorization and authorization.startswith("Bearer "):
+    # Try Stytch session token authentication, skipping the network call for an empty token
+    session_token = (
+        authorization[7:] if authorization and authorization.startswith("Bearer ") else ""
+    )
+    if session_token:
         from .stytch_client import stytch_client
 
-        session_token = authorization[7:]  # Remove "Bearer " prefix
         stytch_user_id = await stytch_client.validate_session(session_token)
 
         if stytch_user_id:
@@ -77,7 +82,7 @@ def validate_api_key(api_key: str | None) -> User | None:
     Returns:
         User if valid, None otherwise
     """
-    if not api_key:
+    if not api_key or len(api_key) not in _API_KEY_LENGTHS:
         return None
 
     return storage.get_user_by_api_key(api_key)
@@ -165,6 +170,7 @@ def require_any_permission(*permissions: Permission) -> Callable:
     Returns:
         A FastAPI dependency function that checks if user has any of the permissions
     """
+    required = frozenset(permissions)
 
     async def permission_checker(current_user: User = Depends(get_current_user)) -> User:
         """Check if current user has any of the required permissions.
@@ -178,7 +184,7 @@ def require_any_permission(*permissions: Permission) -> Callable:
         Raises:
             HTTPException: If user lacks all permissions
         """
-        if any(current_user.has_permission(perm) for perm in permissions):
+        if current_user.has_any_permission(required):
             return current_user
 
         perm_names = ", ".join([p.value for p in permissions])
@@ -2,6 +2,7 @@
 
 import logging
 from datetime import UTC, datetime, timedelta
+from typing import Any
 
 import jwt
 from cent import AsyncClient
@@ -15,16 +16,27 @@ logger = logging.getLogger(__name__)
 class CentrifugoClient:
     """Client for interacting with Centrifugo server."""
 
-    def __init__(self, api_url: str, api_key: str, token_secret: str) -> None:
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        token_secret: str,
+        client: AsyncClient | None = None,
+    ) -> None:
         """Initialize Centrifugo client.
 
         Args:
             api_url: Centrifugo HTTP API URL
             api_key: API key for authentication
             token_secret: Secret for generating JWT tokens
+            client: Optional pre-built API client (defaults to one for api_url and api_key)
         """
-        self.client = AsyncClient(api_url, api_key=api_key, timeout=3.0)
+        if client is None:
+            client = AsyncClient(api_url, api_key=api_key, timeout=3.0)
+        self.client = client
         self.token_secret = token_secret
+        # Encode the HMAC key once instead of on every token we sign
+        self._signing_key = token_secret.encode()
 
     def generate_connection_token(self, user: User) -> str:
         """Generate JWT token for client connection.
@@ -45,18 +57,22 @@ class CentrifugoClient:
                 f"user:{user.username}",  # Allow subscribing to own user channel
             ],
         }
-        return jwt.encode(claims, self.token_secret, algorithm="HS256")
+        return jwt.encode(claims, self._signing_key, algorithm="HS256")
 
-    async def publish_room_message(self, message: Message, from_user: User) -> None:
+    async def publish_room_message(
+        self, message: Message, from_user: User, message_data: dict[str, Any] | None = None
+    ) -> None:
         """Publish a room message to all subscribers.
 
         Args:
             message: Message to publish
             from_user: User who sent the message
+            message_data: Payload already built for this message, if any
         """
-        message_data = MessageResponse.from_message(message, from_user=from_user).model_dump(
-            mode="json"
-        )
+        if message_data is None:
+            message_data = MessageResponse.from_message(message, from_user=from_user).model_dump(
+                mode="json"
+            )
 
         try:
             request = PublishRequest(channel="room:main", data=message_data)
@@ -67,7 +83,11 @@ class CentrifugoClient:
             raise
 
     async def publish_direct_message(
-        self, message: Message, from_user: User, to_user: User
+        self,
+        message: Message,
+        from_user: User,
+        to_user: User,
+        message_data: dict[str, Any] | None = None,
     ) -> None:
         """Publish a direct message to specific user.
 
@@ -75,10 +95,12 @@ class CentrifugoClient:
             message: Message to publish
             from_user: User who sent the message
             to_user: User to receive the message
+            message_data: Payload already built for this message, if any
         """
-        message_data = MessageResponse.from_message(
-            message, from_user=from_user, to_user=to_user
-        ).model_dump(mode="json")
+        if message_data is None:
+            message_data = MessageResponse.from_message(
+                message, from_user=from_user, to_user=to_user
+            ).model_dump(mode="json")
 
         try:
             # Publish to user's personal channel
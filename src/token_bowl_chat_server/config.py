@@ -17,6 +17,11 @@ class Settings(BaseSettings):
     # Webhook settings
     webhook_timeout: float = 10.0
     webhook_max_retries: int = 3
+    webhook_queue_size: int = 100  # Pending deliveries kept per user before dropping the oldest
+    webhook_drain_timeout: float = 5.0  # Seconds shutdown waits for queued deliveries
+
+    # Database settings
+    database_path: str = "chat.db"  # Use ':memory:' for a throwaway in-memory database
 
     # Message settings
     message_history_limit: int = 100
@@ -21,6 +21,10 @@ AVAILABLE_LOGOS = [
     "qwen-color.png",
 ]
 
+# Allowed API key lengths, also used to reject impossible keys before any lookup
+API_KEY_MIN_LENGTH = 32
+API_KEY_MAX_LENGTH = 128
+
 
 class MessageType(str, Enum):
     """Type of message."""
@@ -67,52 +71,62 @@ class Permission(str, Enum):
     ADMIN_ACCESS = "admin:access"
 
 
-# Role to permission mapping
-ROLE_PERMISSIONS: dict[Role, set[Permission]] = {
-    Role.ADMIN: {
-        # Admins have all permissions
-        Permission.READ_MESSAGES,
-        Permission.SEND_ROOM_MESSAGE,
-        Permission.SEND_DIRECT_MESSAGE,
-        Permission.UPDATE_ANY_MESSAGE,
-        Permission.DELETE_ANY_MESSAGE,
-        Permission.READ_USERS,
-        Permission.UPDATE_OWN_PROFILE,
-        Permission.UPDATE_ANY_USER,
-        Permission.DELETE_USER,
-        Permission.ASSIGN_ROLES,
-        Permission.CREATE_BOT,
-        Permission.UPDATE_OWN_BOT,
-        Permission.DELETE_OWN_BOT,
-        Permission.UPDATE_ANY_BOT,
-        Permission.DELETE_ANY_BOT,
-        Permission.ADMIN_ACCESS,
-    },
-    Role.MEMBER: {
-        # Members can do everything except admin functions
-        Permission.READ_MESSAGES,
-        Permission.SEND_ROOM_MESSAGE,
-        Permission.SEND_DIRECT_MESSAGE,
-        Permission.READ_USERS,
-        Permission.UPDATE_OWN_PROFILE,
-        Permission.CREATE_BOT,
-        Permission.UPDATE_OWN_BOT,
-        Permission.DELETE_OWN_BOT,
-    },
-    Role.VIEWER: {
-        # Viewers can only read
-        Permission.READ_MESSAGES,
-        Permission.READ_USERS,
-    },
-    Role.BOT: {
-        # Bots can read and send room messages only
-        Permission.READ_MESSAGES,
-        Permission.SEND_ROOM_MESSAGE,
-        Permission.READ_USERS,
-        Permission.UPDATE_OWN_PROFILE,
-    },
+# Role to permission mapping, frozen so each check is a single set membership test
+ROLE_PERMISSIONS: dict[Role, frozenset[Permission]] = {
+    Role.ADMIN: frozenset(
+        {
+            # Admins have all permissions
+            Permission.READ_MESSAGES,
+            Permission.SEND_ROOM_MESSAGE,
+            Permission.SEND_DIRECT_MESSAGE,
+            Permission.UPDATE_ANY_MESSAGE,
+            Permission.DELETE_ANY_MESSAGE,
+            Permission.READ_USERS,
+            Permission.UPDATE_OWN_PROFILE,
+            Permission.UPDATE_ANY_USER,
+            Permission.DELETE_USER,
+            Permission.ASSIGN_ROLES,
+            Permission.CREATE_BOT,
+            Permission.UPDATE_OWN_BOT,
+            Permission.DELETE_OWN_BOT,
+            Permission.UPDATE_ANY_BOT,
+            Permission.DELETE_ANY_BOT,
+            Permission.ADMIN_ACCESS,
+        }
+    ),
+    Role.MEMBER: frozenset(
+        {
+            # Members can do everything except admin functions
+            Permission.READ_MESSAGES,
+            Permission.SEND_ROOM_MESSAGE,
+            Permission.SEND_DIRECT_MESSAGE,
+            Permission.READ_USERS,
+            Permission.UPDATE_OWN_PROFILE,
+            Permission.CREATE_BOT,
+            Permission.UPDATE_OWN_BOT,
+            Permission.DELETE_OWN_BOT,
+        }
+    ),
+    Role.VIEWER: frozenset(
+        {
+            # Viewers can only read
+            Permission.READ_MESSAGES,
+            Permission.READ_USERS,
+        }
+    ),
+    Role.BOT: frozenset(
+        {
+            # Bots can read and send room messages only
+            Permission.READ_MESSAGES,
+            Permission.SEND_ROOM_MESSAGE,
+            Permission.READ_USERS,
+            Permission.UPDATE_OWN_PROFILE,
+        }
+    ),
 }
 
+_NO_PERMISSIONS: frozenset[Permission] = frozenset()
+
 
 class User(BaseModel):
     """User model."""
@@ -121,7 +135,7 @@ class User(BaseModel):
 
     id: UUID = Field(default_factory=uuid4)  # Primary key
     username: str = Field(..., min_length=1, max_length=50)
-    api_key: str = Field(..., min_length=32, max_length=128)
+    api_key: str = Field(..., min_length=API_KEY_MIN_LENGTH, max_length=API_KEY_MAX_LENGTH)
     role: Role = Role.MEMBER  # New role-based authorization
     created_by: UUID | None = None  # User ID of creator (only for bots)
     stytch_user_id: str | None = None
@@ -173,7 +187,18 @@ class User(BaseModel):
         Returns:
             True if user's role grants the permission
         """
-        return permission in ROLE_PERMISSIONS.get(self.role, set())
+        return permission in ROLE_PERMISSIONS.get(self.role, _NO_PERMISSIONS)
+
+    def has_any_permission(self, permissions: frozenset[Permission]) -> bool:
+        """Check if user has at least one of the given permissions.
+
+        Args:
+            permissions: The permissions to check
+
+        Returns:
+            True if user's role grants any of the permissions
+        """
+        return not permissions.isdisjoint(ROLE_PERMISSIONS.get(self.role, _NO_PERMISSIONS))
 
 
 class Message(BaseModel):
@@ -206,6 +231,12 @@ class SendMessageRequest(BaseModel):
     to_username: str | None = Field(None, min_length=1, max_length=50)
 
 
+class SendMessagesRequest(BaseModel):
+    """Request model for sending several messages in one call."""
+
+    messages: list[SendMessageRequest] = Field(..., min_length=1, max_length=100)
+
+
 class UserRegistration(BaseModel):
     """Request model for user registration."""
 
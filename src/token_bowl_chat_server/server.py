@@ -4,6 +4,7 @@ import logging
 import time
 from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
+from functools import cache
 from pathlib import Path
 
 from fastapi import FastAPI, Request
@@ -25,6 +26,16 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+PUBLIC_DIR = Path(__file__).parent.parent.parent / "public"
+
+
+@cache
+def _public_files() -> StaticFiles | None:
+    """Build the dev-mode static files app once, or None if there is no public dir."""
+    if not PUBLIC_DIR.exists():
+        return None
+    return StaticFiles(directory=str(PUBLIC_DIR))
+
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """Middleware to log HTTP requests and responses."""
@@ -111,7 +122,7 @@ async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
 
     # Shutdown
     logger.info("Shutting down Token Bowl Chat Server...")
-    await webhook_delivery.stop()
+    await webhook_delivery.stop(drain_timeout=settings.webhook_drain_timeout)
     logger.info("Server shutdown complete")
 
 
@@ -144,11 +155,9 @@ def create_app() -> FastAPI:
     app.include_router(router)
 
     # Mount static files in dev mode only
-    if settings.reload:
-        public_dir = Path(__file__).parent.parent.parent / "public"
-        if public_dir.exists():
-            app.mount("/public", StaticFiles(directory=str(public_dir)), name="public")
-            logger.info(f"Static files mounted at /public from {public_dir}")
+    if settings.reload and (public_files := _public_files()) is not None:
+        app.mount("/public", public_files, name="public")
+        logger.info(f"Static files mounted at /public from {PUBLIC_DIR}")
 
     return app
 
@@ -1,6 +1,7 @@
 """SQLite storage for users and messages."""
 
 import sqlite3
+import threading
 from collections.abc import Generator
 from contextlib import contextmanager
 from datetime import datetime
@@ -11,12 +12,16 @@ from alembic import command
 from alembic.config import Config
 from pydantic import HttpUrl
 
+from .config import settings
 from .models import Conversation, Message, MessageType, Role, User
 
 
 class ChatStorage:
     """SQLite storage for the chat server."""
 
+    # Empty in-memory database holding the current schema, copied into new ':memory:' storages
+    _memory_template: sqlite3.Connection | None = None
+
     def __init__(self, db_path: str = "chat.db", message_history_limit: int = 100) -> None:
         """Initialize storage.
 
@@ -33,6 +38,15 @@ class ChatStorage:
             # check_same_thread=False allows connection to be used across threads (safe for in-memory DB)
             self._conn = sqlite3.connect(db_path, check_same_thread=False)
             self._conn.row_factory = sqlite3.Row
+            # Nothing here survives the process, so skip syncs and keep temp tables in RAM
+            self._conn.execute("PRAGMA synchronous = OFF")
+            self._conn.execute("PRAGMA temp_store = MEMORY")
+        # File-based databases keep one connection per thread, so sqlite's
+        # prepared-statement cache survives from one call to the next. Every
+        # one is also tracked here so close() can reach them from any thread.
+        self._local = threading.local()
+        self._thread_conns: list[sqlite3.Connection] = []
+        self._thread_conns_lock = threading.Lock()
 
         self._init_db()
 
@@ -40,104 +54,118 @@ class ChatStorage:
         """Initialize database schema using Alembic migrations."""
         # Skip migrations for in-memory databases in tests
         if self.db_path == ":memory:":
-            # For in-memory databases, create schema directly for speed
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-
-                # Create users table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id TEXT PRIMARY KEY,
-                        username TEXT UNIQUE NOT NULL,
-                        api_key TEXT UNIQUE NOT NULL,
-                        stytch_user_id TEXT UNIQUE,
-                        email TEXT,
-                        webhook_url TEXT,
-                        logo TEXT,
-                        role TEXT NOT NULL DEFAULT 'member',
-                        created_by TEXT,
-                        viewer INTEGER NOT NULL DEFAULT 0,
-                        admin INTEGER NOT NULL DEFAULT 0,
-                        bot INTEGER NOT NULL DEFAULT 0,
-                        emoji TEXT,
-                        created_at TEXT NOT NULL,
-                        FOREIGN KEY (created_by) REFERENCES users(id)
-                    )
-                """)
-
-                # Create messages table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS messages (
-                        id TEXT PRIMARY KEY,
-                        from_username TEXT NOT NULL,
-                        to_username TEXT,
-                        content TEXT NOT NULL,
-                        message_type TEXT NOT NULL,
-                        timestamp TEXT NOT NULL,
-                        FOREIGN KEY (from_username) REFERENCES users(username)
-                    )
-                """)
-
-                # Create indexes for better query performance
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_messages_timestamp
-                    ON messages(timestamp)
-                """)
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_messages_to_username
-                    ON messages(to_username)
-                """)
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_messages_from_username
-                    ON messages(from_username)
-                """)
-
-                # Create read_receipts table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS read_receipts (
-                        message_id TEXT NOT NULL,
-                        username TEXT NOT NULL,
-                        read_at TEXT NOT NULL,
-                        PRIMARY KEY (message_id, username),
-                        FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE CASCADE,
-                        FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
-                    )
-                """)
-
-                # Create indexes for read_receipts
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_read_receipts_username
-                    ON read_receipts(username)
-                """)
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_read_receipts_message_id
-                    ON read_receipts(message_id)
-                """)
-
-                # Create conversations table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS conversations (
-                        id TEXT PRIMARY KEY,
-                        title TEXT,
-                        description TEXT,
-                        message_ids TEXT NOT NULL,
-                        created_by_username TEXT NOT NULL,
-                        created_at TEXT NOT NULL,
-                        FOREIGN KEY (created_by_username) REFERENCES users(username) ON DELETE CASCADE
-                    )
-                """)
-
-                # Create index for conversations by creator
-                cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_conversations_created_by
-                    ON conversations(created_by_username)
-                """)
+            # Build the schema once per process, then copy it into each new database
+            if ChatStorage._memory_template is None:
+                template = sqlite3.connect(":memory:", check_same_thread=False)
+                self._create_schema(template)
+                ChatStorage._memory_template = template
 
-                conn.commit()
+            with self._get_connection() as conn:
+                ChatStorage._memory_template.backup(conn)
         else:
             # For file-based databases, use Alembic migrations
             self._run_migrations()
 
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
+        """Create the latest schema directly, without running migrations.
+
+        Args:
+            conn: Connection to an empty database
+        """
+        cursor = conn.cursor()
+
+        # Create users table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id TEXT PRIMARY KEY,
+                username TEXT UNIQUE NOT NULL,
+                api_key TEXT UNIQUE NOT NULL,
+                stytch_user_id TEXT UNIQUE,
+                email TEXT,
+                webhook_url TEXT,
+                logo TEXT,
+                role TEXT NOT NULL DEFAULT 'member',
+                created_by TEXT,
+                viewer INTEGER NOT NULL DEFAULT 0,
+                admin INTEGER NOT NULL DEFAULT 0,
+                bot INTEGER NOT NULL DEFAULT 0,
+                emoji TEXT,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (created_by) REFERENCES users(id)
+            )
+        """)
+
+        # Create messages table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id TEXT PRIMARY KEY,
+                from_username TEXT NOT NULL,
+                to_username TEXT,
+                content TEXT NOT NULL,
+                message_type TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                FOREIGN KEY (from_username) REFERENCES users(username)
+            )
+        """)
+
+        # Create indexes for better query performance
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_messages_timestamp
+            ON messages(timestamp)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_messages_to_username
+            ON messages(to_username)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_messages_from_username
+            ON messages(from_username)
+        """)
+
+        # Create read_receipts table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS read_receipts (
+                message_id TEXT NOT NULL,
+                username TEXT NOT NULL,
+                read_at TEXT NOT NULL,
+                PRIMARY KEY (message_id, username),
+                FOREIGN KEY (message_id) REFERENCES messages(id) ON DELETE CASCADE,
+                FOREIGN KEY (username) REFERENCES users(username) ON DELETE CASCADE
+            )
+        """)
+
+        # Create indexes for read_receipts
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_read_receipts_username
+            ON read_receipts(username)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_read_receipts_message_id
+            ON read_receipts(message_id)
+        """)
+
+        # Create conversations table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                title TEXT,
+                description TEXT,
+                message_ids TEXT NOT NULL,
+                created_by_username TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (created_by_username) REFERENCES users(username) ON DELETE CASCADE
+            )
+        """)
+
+        # Create index for conversations by creator
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_created_by
+            ON conversations(created_by_username)
+        """)
+
+        conn.commit()
+
     def _run_migrations(self) -> None:
         """Run Alembic migrations to upgrade database to latest version."""
         # Get the path to alembic.ini
@@ -159,19 +187,39 @@ class ChatStorage:
             # Use persistent connection for in-memory databases
             yield self._conn
         else:
-            # Create temporary connection for file-based databases
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                # Only the owning thread uses the connection, but close() may run elsewhere
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                self._local.conn = conn
+                with self._thread_conns_lock:
+                    self._thread_conns.append(conn)
             try:
                 yield conn
             finally:
-                conn.close()
+                # Drop anything left uncommitted, as closing the connection used to
+                if conn.in_transaction:
+                    conn.rollback()
 
-    def __del__(self) -> None:
-        """Close persistent connection on deletion."""
+    def close(self) -> None:
+        """Close every connection this storage has opened.
+
+        A file-based storage opens fresh connections if it is used again.
+        """
         if self._conn is not None:
             self._conn.close()
 
+        with self._thread_conns_lock:
+            thread_conns, self._thread_conns = self._thread_conns, []
+            self._local = threading.local()
+        for conn in thread_conns:
+            conn.close()
+
+    def __del__(self) -> None:
+        """Close connections on deletion."""
+        self.close()
+
     def add_user(self, user: User) -> None:
         """Add a user to storage.
 
@@ -492,23 +540,34 @@ class ChatStorage:
         Args:
             message: Message to add
         """
+        self.add_messages([message])
+
+    def add_messages(self, messages: list[Message]) -> None:
+        """Add several messages to storage in a single transaction.
+
+        Args:
+            messages: Messages to add
+        """
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
-            # Insert message
-            cursor.execute(
+            # Insert messages
+            cursor.executemany(
                 """
                 INSERT INTO messages (id, from_username, to_username, content, message_type, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    str(message.id),
-                    message.from_username,
-                    message.to_username,
-                    message.content,
-                    message.message_type.value,
-                    message.timestamp.isoformat(),
-                ),
+                [
+                    (
+                        str(message.id),
+                        message.from_username,
+                        message.to_username,
+                        message.content,
+                        message.message_type.value,
+                        message.timestamp.isoformat(),
+                    )
+                    for message in messages
+                ],
             )
 
             # Trim message history if needed
@@ -1020,28 +1079,19 @@ class ChatStorage:
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
-            # Get all unread message IDs for this user
+            # Insert read receipts for every unread message in a single statement
+            read_at = datetime.now().isoformat()
             cursor.execute(
                 """
-                SELECT m.id FROM messages m
+                INSERT OR IGNORE INTO read_receipts (message_id, username, read_at)
+                SELECT m.id, ?, ? FROM messages m
                 LEFT JOIN read_receipts rr
                 ON m.id = rr.message_id AND rr.username = ?
                 WHERE rr.message_id IS NULL
                 AND (m.to_username IS NULL OR m.to_username = ? OR m.from_username = ?)
                 AND m.from_username != ?
                 """,
-                (username, username, username, username),
-            )
-            unread_ids = [row["id"] for row in cursor.fetchall()]
-
-            if not unread_ids:
-                return 0
-
-            # Insert read receipts for all unread messages
-            read_at = datetime.now().isoformat()
-            cursor.executemany(
-                "INSERT OR IGNORE INTO read_receipts (message_id, username, read_at) VALUES (?, ?, ?)",
-                [(msg_id, username, read_at) for msg_id in unread_ids],
+                (username, read_at, username, username, username, username),
             )
             conn.commit()
             return cursor.rowcount
@@ -1125,34 +1175,24 @@ class ChatStorage:
         with self._get_connection() as conn:
             cursor = conn.cursor()
 
-            # Count unread room messages
+            # Count unread room and direct messages in a single pass
             cursor.execute(
                 """
-                SELECT COUNT(*) as count FROM messages m
+                SELECT
+                    COALESCE(SUM(m.to_username IS NULL), 0) as unread_room,
+                    COALESCE(SUM(m.to_username IS NOT NULL), 0) as unread_direct
+                FROM messages m
                 LEFT JOIN read_receipts rr
                 ON m.id = rr.message_id AND rr.username = ?
-                WHERE m.to_username IS NULL
-                AND rr.message_id IS NULL
-                AND m.from_username != ?
-                """,
-                (username, username),
-            )
-            unread_room = cursor.fetchone()["count"]
-
-            # Count unread direct messages
-            cursor.execute(
-                """
-                SELECT COUNT(*) as count FROM messages m
-                LEFT JOIN read_receipts rr
-                ON m.id = rr.message_id AND rr.username = ?
-                WHERE m.to_username IS NOT NULL
-                AND (m.to_username = ? OR m.from_username = ?)
-                AND rr.message_id IS NULL
+                WHERE rr.message_id IS NULL
+                AND (m.to_username IS NULL OR m.to_username = ?)
                 AND m.from_username != ?
                 """,
-                (username, username, username, username),
+                (username, username, username),
             )
-            unread_direct = cursor.fetchone()["count"]
+            row = cursor.fetchone()
+            unread_room = row["unread_room"]
+            unread_direct = row["unread_direct"]
 
             return unread_room, unread_direct, unread_room + unread_direct
 
@@ -1392,4 +1432,4 @@ class ChatStorage:
 
 
 # Global storage instance
-storage = ChatStorage()
+storage = ChatStorage(db_path=settings.database_path)
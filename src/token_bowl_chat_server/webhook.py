@@ -2,9 +2,11 @@
 
 import asyncio
 import logging
+from typing import Any
 
 import httpx
 
+from .config import settings
 from .models import Message, MessageResponse, User
 
 logger = logging.getLogger(__name__)
@@ -13,54 +15,96 @@ logger = logging.getLogger(__name__)
 class WebhookDelivery:
     """Handles webhook delivery to users."""
 
-    def __init__(self, timeout: float = 10.0, max_retries: int = 3) -> None:
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        queue_size: int = 100,
+        transport: httpx.AsyncBaseTransport | None = None,
+        retry_delay: float = 1.0,
+    ) -> None:
         """Initialize webhook delivery system.
 
         Args:
             timeout: Timeout for webhook requests in seconds
             max_retries: Maximum number of retry attempts
+            queue_size: Maximum number of pending deliveries per user
+            transport: Optional httpx transport for the client (defaults to real HTTP)
+            retry_delay: Seconds to wait before the first retry, doubled for each one after
         """
         self.timeout = timeout
         self.max_retries = max_retries
+        self.queue_size = queue_size
+        self.transport = transport
+        self.retry_delay = retry_delay
         self.client: httpx.AsyncClient | None = None
+        # Per-user outbound queues of (user, payload), each drained by its own relay task
+        self._queues: dict[str, asyncio.Queue[tuple[User, dict[str, Any]]]] = {}
+        self._relays: dict[str, asyncio.Task[None]] = {}
 
     async def start(self) -> None:
         """Start the webhook delivery system."""
-        self.client = httpx.AsyncClient(timeout=self.timeout)
+        self.client = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
+
+    async def stop(self, drain_timeout: float = 0.0) -> None:
+        """Stop the webhook delivery system.
+
+        Args:
+            drain_timeout: Seconds to wait for queued deliveries to finish before
+                the relays are cancelled; anything still queued after that is dropped
+        """
+        if drain_timeout > 0 and self._queues:
+            try:
+                await asyncio.wait_for(self.join(), drain_timeout)
+            except TimeoutError:
+                pending = sum(queue.qsize() for queue in self._queues.values())
+                logger.warning(f"Dropping {pending} queued webhook deliveries on shutdown")
+
+        for relay in self._relays.values():
+            relay.cancel()
+        await asyncio.gather(*self._relays.values(), return_exceptions=True)
+        self._relays.clear()
+        self._queues.clear()
 
-    async def stop(self) -> None:
-        """Stop the webhook delivery system."""
         if self.client:
             await self.client.aclose()
             self.client = None
 
-    async def deliver_message(self, user: User, message: Message) -> bool:
-        """Deliver a message to a user's webhook URL.
+    def _payload(self, message: Message) -> dict[str, Any]:
+        """Build the webhook payload for a message.
+
+        The payload is the same for every recipient, so callers fanning a
+        message out to several webhooks build it once and share it.
 
         Args:
-            user: User to deliver message to
             message: Message to deliver
 
         Returns:
-            True if delivery was successful, False otherwise
+            Message payload as sent to webhooks
         """
-        if not user.webhook_url:
-            logger.debug(f"User {user.username} has no webhook URL configured")
-            return False
-
-        if not self.client:
-            logger.error("Webhook client not initialized")
-            return False
-
         # Fetch sender and recipient user info for display
         from .storage import storage
 
         from_user = storage.get_user_by_username(message.from_username)
         to_user = storage.get_user_by_username(message.to_username) if message.to_username else None
-        message_data = MessageResponse.from_message(
+        return MessageResponse.from_message(
             message, from_user=from_user, to_user=to_user
         ).model_dump()
 
+    async def _post(self, user: User, message_data: dict[str, Any]) -> bool:
+        """POST a prepared payload to a user's webhook URL, with retries.
+
+        Args:
+            user: User to deliver message to
+            message_data: Payload built by _payload
+
+        Returns:
+            True if delivery was successful, False otherwise
+        """
+        if not self.client:
+            logger.error("Webhook client not initialized")
+            return False
+
         for attempt in range(self.max_retries):
             try:
                 response = await self.client.post(
@@ -98,34 +142,108 @@ class WebhookDelivery:
 
             # Wait before retrying (exponential backoff)
             if attempt < self.max_retries - 1:
-                await asyncio.sleep(2**attempt)
+                await asyncio.sleep(self.retry_delay * 2**attempt)
 
         logger.error(
             f"Failed to deliver message to {user.username} after {self.max_retries} attempts"
         )
         return False
 
-    async def broadcast_to_webhooks(
-        self, message: Message, users: list[User], exclude_username: str | None = None
+    def enqueue(
+        self, user: User, message: Message, message_data: dict[str, Any] | None = None
     ) -> None:
-        """Broadcast a message to multiple users via webhooks.
+        """Queue a message for background delivery to a user's webhook.
+
+        Each user has a bounded queue drained in order by a relay task, so a slow
+        or failing webhook only holds up its own deliveries. The relay exits once
+        the queue is empty and a later message starts a new one. When the queue
+        is full the oldest pending message is dropped.
+
+        Args:
+            user: User to deliver message to
+            message: Message to deliver
+            message_data: Payload already built for this message, if any
+        """
+        if not user.webhook_url:
+            return
+
+        if not self.client:
+            logger.error("Webhook client not initialized")
+            return
+
+        queue = self._queues.get(user.username)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.queue_size)
+            self._queues[user.username] = queue
+            self._relays[user.username] = asyncio.create_task(self._relay(user.username, queue))
+
+        if queue.full():
+            _, dropped = queue.get_nowait()
+            queue.task_done()
+            logger.warning(
+                f"Webhook queue for {user.username} is full, dropping message {dropped['id']}"
+            )
+
+        if message_data is None:
+            message_data = self._payload(message)
+        queue.put_nowait((user, message_data))
+
+    def enqueue_broadcast(
+        self,
+        message: Message,
+        users: list[User],
+        exclude_username: str | None = None,
+        message_data: dict[str, Any] | None = None,
+    ) -> None:
+        """Queue a message for background delivery to multiple users' webhooks.
 
         Args:
             message: Message to broadcast
             users: List of users to send to
             exclude_username: Username to exclude from broadcast (e.g., the sender)
+            message_data: Payload already built for this message, if any
         """
-        tasks = []
         for user in users:
             if exclude_username and user.username == exclude_username:
                 continue
+            if message_data is None and user.webhook_url:
+                message_data = self._payload(message)
+            self.enqueue(user, message, message_data)
+
+    async def join(self) -> None:
+        """Wait until every queued delivery has been attempted."""
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
 
-            if user.webhook_url:
-                tasks.append(self.deliver_message(user, message))
+    async def _relay(
+        self, username: str, queue: asyncio.Queue[tuple[User, dict[str, Any]]]
+    ) -> None:
+        """Deliver queued messages for one user, one at a time.
+
+        Args:
+            username: User whose queue this is
+            queue: The user's outbound queue
+        """
+        while True:
+            user, message_data = await queue.get()
+            try:
+                await self._post(user, message_data)
+            except Exception as e:
+                logger.error(f"Unexpected error in webhook relay for {user.username}: {e}")
+            finally:
+                queue.task_done()
 
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+            # Retire once idle; enqueue starts a new relay for the next message.
+            # There is no await between this check and the removal, so nothing
+            # can be queued in between.
+            if queue.empty():
+                del self._queues[username]
+                del self._relays[username]
+                return
 
 
 # Global webhook delivery instance
-webhook_delivery = WebhookDelivery()
+webhook_delivery = WebhookDelivery(
+    timeout=settings.webhook_timeout,
+    max_retries=settings.webhook_max_retries,
+    queue_size=settings.webhook_queue_size,
+)
@@ -1,13 +1,27 @@
 """Pytest configuration and fixtures."""
 
+import os
+from collections.abc import Callable
+from unittest.mock import NonCallableMagicMock
+
+# Give the import-time global storage a private in-memory database. Every
+# pytest-xdist worker is a separate process, so workers never share a file.
+os.environ["DATABASE_PATH"] = ":memory:"
+
+import httpx
 import pytest
+import pytest_asyncio
+from cent import AsyncClient
 from fastapi.testclient import TestClient
 
 from token_bowl_chat_server import api as api_module
 from token_bowl_chat_server import auth as auth_module
 from token_bowl_chat_server import centrifugo_client as centrifugo_module
 from token_bowl_chat_server import storage as storage_module
+from token_bowl_chat_server.auth import generate_api_key
+from token_bowl_chat_server.centrifugo_client import CentrifugoClient
 from token_bowl_chat_server.config import settings
+from token_bowl_chat_server.models import Role, User
 from token_bowl_chat_server.server import create_app
 from token_bowl_chat_server.storage import ChatStorage
 
@@ -32,58 +46,97 @@ def test_storage():
     auth_module.storage = original_storage
 
 
+@pytest.fixture
+def make_user(test_storage) -> Callable[..., User]:
+    """Add users straight to storage, for tests that aren't about registration."""
+
+    def _make(username: str, role: Role = Role.MEMBER, **fields) -> User:
+        user = User(username=username, api_key=generate_api_key(), role=role, **fields)
+        test_storage.add_user(user)
+        return user
+
+    return _make
+
+
+# Stand-in for the Centrifugo HTTP API client, built once; the fake below never calls it
+_OFFLINE_CENTRIFUGO_API = NonCallableMagicMock(spec=AsyncClient)
+
+
+class FakeCentrifugoClient(CentrifugoClient):
+    """Centrifugo client that signs real tokens but never talks to a server.
+
+    A plain subclass is much cheaper to build per test than
+    ``MagicMock(spec=CentrifugoClient)``, and tests that need to inspect a
+    publish still ``patch.object`` the method they care about.
+    """
+
+    def __init__(self, token_secret: str) -> None:
+        # Every method that would reach the server is overridden below
+        super().__init__(
+            api_url="", api_key="", token_secret=token_secret, client=_OFFLINE_CENTRIFUGO_API
+        )
+
+    async def publish_room_message(self, *args, **kwargs) -> None:
+        """Drop room messages."""
+
+    async def publish_direct_message(self, *args, **kwargs) -> None:
+        """Drop direct messages."""
+
+    async def publish_read_receipt(self, *args, **kwargs) -> None:
+        """Drop read receipts."""
+
+    async def publish_typing_indicator(self, *args, **kwargs) -> None:
+        """Drop typing indicators."""
+
+    async def publish_unread_count(self, *args, **kwargs) -> None:
+        """Drop unread count updates."""
+
+    async def disconnect_user(self, *args, **kwargs) -> None:
+        """Ignore disconnects."""
+
+
 @pytest.fixture(autouse=True)
 def test_centrifugo():
-    """Mock Centrifugo client for tests."""
-    from unittest.mock import AsyncMock, MagicMock
-
-    from token_bowl_chat_server.centrifugo_client import CentrifugoClient
-
-    # Create a mock Centrifugo client that doesn't require an event loop
-    mock_client = MagicMock(spec=CentrifugoClient)
-    mock_client.token_secret = settings.centrifugo_token_secret
-    mock_client.generate_connection_token = lambda user: __import__("jwt").encode(
-        {
-            "sub": user.username,
-            "exp": int(
-                (
-                    __import__("datetime").datetime.now(__import__("datetime").UTC)
-                    + __import__("datetime").timedelta(hours=24)
-                ).timestamp()
-            ),
-            "iat": int(__import__("datetime").datetime.now(__import__("datetime").UTC).timestamp()),
-        },
-        settings.centrifugo_token_secret,
-        algorithm="HS256",
-    )
-    mock_client.publish_room_message = AsyncMock()
-    mock_client.publish_direct_message = AsyncMock()
-    mock_client.disconnect_user = AsyncMock()
-    # Add mock .client attribute for testing disconnect
-    mock_client.client = MagicMock()
-    mock_client.client.disconnect = AsyncMock()
+    """Install a fake Centrifugo client for each test."""
+    fake_client = FakeCentrifugoClient(settings.centrifugo_token_secret)
 
     # Set as global instance
-    centrifugo_module.centrifugo_client = mock_client
+    centrifugo_module.centrifugo_client = fake_client
 
-    yield mock_client
+    yield fake_client
 
     # Reset to None after test
     centrifugo_module.centrifugo_client = None
 
 
-@pytest.fixture
-def app(test_storage):
-    """Create a fresh FastAPI app for testing."""
+@pytest.fixture(scope="session")
+def app():
+    """Create one FastAPI app for the whole test session.
+
+    Handlers look up ``storage`` through module globals on every request, so the
+    autouse ``test_storage`` fixture still gives each test its own database.
+    """
     return create_app()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client(app):
-    """Create a test client."""
+    """Create a test client shared by every test in the session.
+
+    The API sets no cookies, so the client carries no state between tests.
+    """
     return TestClient(app)
 
 
+@pytest_asyncio.fixture
+async def asgi_client(app):
+    """Create an in-process async client that calls the app over ASGI."""
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+    ) as async_client:
+        yield async_client
+
+
 @pytest.fixture
 def registered_user(client):
     """Register a test user and return registration data."""
@@ -95,6 +148,12 @@ def registered_user(client):
     return response.json()
 
 
+@pytest.fixture
+def auth_headers(registered_user):
+    """Authentication headers for the registered test user."""
+    return {"X-API-Key": registered_user["api_key"]}
+
+
 @pytest.fixture
 def registered_user2(client):
     """Register a second test user."""
@@ -115,3 +174,9 @@ def registered_admin(client):
     )
     assert response.status_code == 201
     return response.json()
+
+
+@pytest.fixture
+def admin_headers(registered_admin):
+    """Authentication headers for the registered admin user."""
+    return {"X-API-Key": registered_admin["api_key"]}
@@ -1,7 +1,15 @@
 """Tests for API endpoints."""
 
+import json
+from collections import defaultdict
 from unittest.mock import patch
 
+import httpx
+import pytest
+import pytest_asyncio
+
+from token_bowl_chat_server.webhook import webhook_delivery
+
 
 def test_health_check(client):
     """Test health check endpoint."""
@@ -125,6 +133,88 @@ def test_send_direct_message_to_nonexistent_user(client, registered_user):
     assert response.status_code == 404
 
 
+def test_send_messages_bulk(client, registered_user, registered_user2):
+    """Test sending several messages in one request."""
+    headers = {"X-API-Key": registered_user["api_key"]}
+    response = client.post(
+        "/messages/bulk",
+        json={
+            "messages": [
+                {"content": "First"},
+                {"content": "Second", "to_username": "test_user2"},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    data = response.json()
+    assert [m["content"] for m in data] == ["First", "Second"]
+    assert data[0]["message_type"] == "room"
+    assert data[1]["to_username"] == "test_user2"
+
+
+def test_send_messages_bulk_rejects_whole_batch(client, registered_user):
+    """Test that one invalid message stops the whole batch from being stored."""
+    headers = {"X-API-Key": registered_user["api_key"]}
+    response = client.post(
+        "/messages/bulk",
+        json={"messages": [{"content": "Hello"}, {"content": "Hi", "to_username": "nobody"}]},
+        headers=headers,
+    )
+    assert response.status_code == 404
+
+    response = client.get("/messages", headers=headers)
+    assert response.json()["messages"] == []
+
+
+@pytest_asyncio.fixture
+async def webhook_posts(monkeypatch):
+    """Start the shared webhook delivery on an in-memory transport.
+
+    Yields the JSON bodies posted to each webhook URL, in delivery order.
+    """
+    posts: defaultdict[str, list[dict]] = defaultdict(list)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        posts[str(request.url)].append(json.loads(request.content))
+        return httpx.Response(200)
+
+    monkeypatch.setattr(webhook_delivery, "transport", httpx.MockTransport(handler))
+    monkeypatch.setattr(webhook_delivery, "retry_delay", 0)
+    await webhook_delivery.start()
+    yield posts
+    await webhook_delivery.stop()
+
+
+@pytest.mark.asyncio
+async def test_sent_messages_reach_webhooks(asgi_client, make_user, webhook_posts):
+    """Test that room, direct and bulk messages are posted to recipients' webhooks."""
+    sender = make_user("sender", webhook_url="https://example.com/sender")
+    make_user("alice", webhook_url="https://example.com/alice")
+    make_user("bob", webhook_url="https://example.com/bob")
+    headers = {"X-API-Key": sender.api_key}
+
+    room = await asgi_client.post("/messages", json={"content": "Hello room"}, headers=headers)
+    direct = await asgi_client.post(
+        "/messages", json={"content": "Hello Alice", "to_username": "alice"}, headers=headers
+    )
+    bulk = await asgi_client.post(
+        "/messages/bulk",
+        json={"messages": [{"content": "Bulk room"}, {"content": "Bulk DM", "to_username": "bob"}]},
+        headers=headers,
+    )
+    assert room.status_code == direct.status_code == bulk.status_code == 201
+    bulk_room, bulk_direct = bulk.json()
+
+    await webhook_delivery.join()
+
+    # Webhooks get the same body the sender got back; the sender gets nothing
+    assert webhook_posts == {
+        "https://example.com/alice": [room.json(), direct.json(), bulk_room],
+        "https://example.com/bob": [room.json(), bulk_room, bulk_direct],
+    }
+
+
 def test_get_messages(client, registered_user):
     """Test getting recent room messages."""
     headers = {"X-API-Key": registered_user["api_key"]}
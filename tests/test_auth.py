@@ -4,7 +4,7 @@ import pytest
 from fastapi import HTTPException
 
 from token_bowl_chat_server.auth import generate_api_key, get_current_user, validate_api_key
-from token_bowl_chat_server.models import User
+from token_bowl_chat_server.models import API_KEY_MAX_LENGTH, API_KEY_MIN_LENGTH, User
 
 
 def test_generate_api_key():
@@ -24,15 +24,12 @@ def test_generate_api_key():
 
 
 @pytest.mark.asyncio
-async def test_get_current_user_valid_key(test_storage):
+async def test_get_current_user_valid_key(make_user):
     """Test getting current user with valid API key."""
-    # Create a user
-    api_key = generate_api_key()
-    user = User(username="test_user", api_key=api_key)
-    test_storage.add_user(user)
+    user = make_user("test_user")
 
     # Get user with valid key
-    result = await get_current_user(api_key=api_key, authorization=None)
+    result = await get_current_user(api_key=user.api_key, authorization=None)
     assert result.username == "test_user"
 
 
@@ -56,15 +53,12 @@ async def test_get_current_user_invalid_key():
     assert "Invalid or missing authentication credentials" in exc_info.value.detail
 
 
-def test_validate_api_key_valid(test_storage):
+def test_validate_api_key_valid(make_user):
     """Test validate_api_key with valid key."""
-    # Create a user
-    api_key = generate_api_key()
-    user = User(username="test_user", api_key=api_key)
-    test_storage.add_user(user)
+    user = make_user("test_user")
 
     # Validate
-    result = validate_api_key(api_key)
+    result = validate_api_key(user.api_key)
     assert result is not None
     assert result.username == "test_user"
 
@@ -79,3 +73,30 @@ def test_validate_api_key_invalid():
     """Test validate_api_key with invalid key."""
     result = validate_api_key("invalid_key")
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_malformed_api_key_skips_storage(test_storage, monkeypatch):
+    """Test that keys no user could have are rejected without a storage lookup."""
+
+    def fail(api_key):
+        raise AssertionError("storage should not be queried")
+
+    monkeypatch.setattr(test_storage, "get_user_by_api_key", fail)
+
+    for api_key in ("a" * (API_KEY_MIN_LENGTH - 1), "a" * (API_KEY_MAX_LENGTH + 1)):
+        assert validate_api_key(api_key) is None
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(api_key=api_key, authorization=None)
+        assert exc_info.value.status_code == 401
+
+
+def test_api_keys_at_length_bounds_are_accepted(test_storage):
+    """Test that the auth length pre-check admits every key length User allows."""
+    for length in (API_KEY_MIN_LENGTH, API_KEY_MAX_LENGTH):
+        user = User(username=f"user_{length}", api_key="k" * length)
+        test_storage.add_user(user)
+
+        validated = validate_api_key(user.api_key)
+        assert validated is not None
+        assert validated.username == user.username
@@ -1,61 +1,103 @@
 """Tests for Centrifugo integration."""
 
 from datetime import UTC, datetime
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
 import jwt
 import pytest
+import pytest_asyncio
+from cent import AsyncClient
+from jwt import PyJWT
+
+from token_bowl_chat_server.centrifugo_client import CentrifugoClient, get_centrifugo_client
+from token_bowl_chat_server.models import User
+
+# Decode options for tests that only inspect claims; signature checks live in
+# test_get_centrifugo_connection_token and test_centrifugo_client_generate_token
+_CLAIMS_ONLY = {"verify_signature": False, "verify_exp": False}
+
+# Connection tokens live for ~24 hours; accept anything between 23 and 25 hours
+_MIN_TOKEN_TTL = 82_800
+_MAX_TOKEN_TTL = 90_000
+
+# Fixed user for token generation tests (64-char API key, frozen creation time)
+_TOKEN_USER = User(
+    id="550e8400-e29b-41d4-a716-446655440000",
+    username="testuser",
+    api_key="a" * 64,
+    created_at=datetime(2025, 1, 1, tzinfo=UTC),
+)
+
+
+@pytest.fixture(scope="session")
+def jwt_cfg():
+    """Expected connection-token settings plus a JWT decoder shared by the session."""
+    decoder = PyJWT()
+    secret = "your-secret-key-change-in-production"
+    return SimpleNamespace(
+        secret=secret,
+        ws_url="ws://localhost:8001/connection/websocket",
+        decode=lambda token: decoder.decode(token, secret, algorithms=["HS256"]),
+        decode_claims=lambda token: decoder.decode(token, options=_CLAIMS_ONLY),
+    )
+
 
-from token_bowl_chat_server.centrifugo_client import CentrifugoClient
+@pytest.fixture
+def centrifugo(test_centrifugo):
+    """Return the Centrifugo client installed for the current test."""
+    return get_centrifugo_client()
 
 
-def test_get_centrifugo_connection_token(client, registered_user):
-    """Test getting a Centrifugo connection token."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-    response = client.get("/centrifugo/connection-token", headers=headers)
+@pytest_asyncio.fixture
+async def token_bundle(asgi_client, jwt_cfg, auth_headers):
+    """Fetch the test user's connection token and return it with decoded claims."""
+    response = await asgi_client.get("/centrifugo/connection-token", headers=auth_headers)
 
     assert response.status_code == 200
     data = response.json()
+    return data, jwt_cfg.decode_claims(data["token"])
+
+
+@pytest.mark.asyncio
+async def test_get_centrifugo_connection_token(jwt_cfg, token_bundle):
+    """Test getting a Centrifugo connection token and the claims it carries."""
+    data, decoded = token_bundle
 
     # Verify response structure
     assert "token" in data
     assert "url" in data
     assert "user" in data
     assert data["user"] == "test_user"
-    assert "ws://localhost:8001/connection/websocket" in data["url"]
+    assert jwt_cfg.ws_url in data["url"]
 
-    # Verify JWT token
-    token = data["token"]
-    decoded = jwt.decode(token, "your-secret-key-change-in-production", algorithms=["HS256"])
+    # Verify JWT token is signed with the configured secret
+    assert jwt_cfg.decode(data["token"]) == decoded
     assert decoded["sub"] == "test_user"
-    assert "exp" in decoded
-    assert "iat" in decoded
+
+    # Verify token expiration is in the future
+    assert decoded["exp"] > decoded["iat"]
+
+    # Verify token is valid for reasonable duration (should be ~24 hours)
+    duration_seconds = decoded["exp"] - decoded["iat"]
+    assert _MIN_TOKEN_TTL < duration_seconds < _MAX_TOKEN_TTL
 
 
-def test_get_centrifugo_connection_token_requires_auth(client):
+@pytest.mark.asyncio
+async def test_get_centrifugo_connection_token_requires_auth(asgi_client):
     """Test that connection token endpoint requires authentication."""
-    response = client.get("/centrifugo/connection-token")
+    response = await asgi_client.get("/centrifugo/connection-token")
     assert response.status_code == 401
 
 
 @pytest.mark.asyncio
 async def test_centrifugo_client_generate_token():
     """Test Centrifugo client token generation."""
-    from token_bowl_chat_server.models import User
-
     client = CentrifugoClient(
         api_url="http://localhost:8001/api", api_key="test-key", token_secret="test-secret"
     )
 
-    # Create a user with a proper 64-char API key
-    user = User(
-        id="550e8400-e29b-41d4-a716-446655440000",
-        username="testuser",
-        api_key="a" * 64,  # Valid 64-char API key
-        created_at=datetime.now(UTC),
-    )
-
-    token = client.generate_connection_token(user)
+    token = client.generate_connection_token(_TOKEN_USER)
 
     # Verify it's a valid JWT
     decoded = jwt.decode(token, "test-secret", algorithms=["HS256"])
@@ -64,22 +106,35 @@ async def test_centrifugo_client_generate_token():
     assert "iat" in decoded
 
 
-def test_send_room_message_publishes_to_centrifugo(client, registered_user):
-    """Test that sending a room message publishes to Centrifugo."""
-    from token_bowl_chat_server.centrifugo_client import get_centrifugo_client
+def test_centrifugo_client_generate_token_reuses_signing_key():
+    """Test that every token is signed with the key prepared once at init."""
+    client = CentrifugoClient(
+        api_url="http://localhost:8001/api", api_key="test-key", token_secret="test-secret"
+    )
+
+    with patch.object(jwt, "encode", wraps=jwt.encode) as mock_encode:
+        for _ in range(3):
+            client.generate_connection_token(_TOKEN_USER)
 
-    # Get the actual Centrifugo client and mock its publish method
-    centrifugo = get_centrifugo_client()
+    # Encoding the secret per call would hand jwt a new bytes object each time
+    first_key, *other_keys = (call.args[1] for call in mock_encode.call_args_list)
+    assert first_key == b"test-secret"
+    assert len(other_keys) == 2
+    assert all(key is first_key for key in other_keys)
 
+
+@pytest.mark.asyncio
+async def test_send_room_message_publishes_to_centrifugo(asgi_client, centrifugo, auth_headers):
+    """Test that sending a room message publishes to Centrifugo."""
     with patch.object(centrifugo, "publish_room_message", new_callable=AsyncMock) as mock_publish:
-        headers = {"X-API-Key": registered_user["api_key"]}
-        response = client.post(
+        response = await asgi_client.post(
             "/messages",
             json={"content": "Hello, room!"},
-            headers=headers,
+            headers=auth_headers,
         )
 
         assert response.status_code == 201
+        assert response.json()["content"] == "Hello, room!"
 
         # Verify Centrifugo publish was called
         mock_publish.assert_called_once()
@@ -93,20 +148,20 @@ def test_send_room_message_publishes_to_centrifugo(client, registered_user):
         assert message.message_type == "room"
         assert from_user.username == "test_user"
 
+        # The payload is built once and matches what the sender gets back
+        assert mock_publish.call_args.kwargs["message_data"] == response.json()
 
-def test_send_direct_message_publishes_to_centrifugo(client, registered_user, registered_user2):
-    """Test that sending a direct message publishes to Centrifugo."""
-    from token_bowl_chat_server.centrifugo_client import get_centrifugo_client
-
-    # Get the actual Centrifugo client and mock its publish method
-    centrifugo = get_centrifugo_client()
 
+@pytest.mark.asyncio
+async def test_send_direct_message_publishes_to_centrifugo(
+    asgi_client, centrifugo, auth_headers, registered_user2
+):
+    """Test that sending a direct message publishes to Centrifugo."""
     with patch.object(centrifugo, "publish_direct_message", new_callable=AsyncMock) as mock_publish:
-        headers = {"X-API-Key": registered_user["api_key"]}
-        response = client.post(
+        response = await asgi_client.post(
             "/messages",
             json={"content": "Private message", "to_username": "test_user2"},
-            headers=headers,
+            headers=auth_headers,
         )
 
         assert response.status_code == 201
@@ -125,80 +180,43 @@ def test_send_direct_message_publishes_to_centrifugo(client, registered_user, re
         assert from_user.username == "test_user"
         assert to_user.username == "test_user2"
 
-
-def test_centrifugo_success_with_mock(client, registered_user):
-    """Test that messages publish successfully when Centrifugo is available."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-    response = client.post(
-        "/messages",
-        json={"content": "Hello, room!"},
-        headers=headers,
-    )
-
-    # With the mocked Centrifugo client, requests should succeed
-    assert response.status_code == 201
-    data = response.json()
-    assert data["content"] == "Hello, room!"
+        # The payload is built once and matches what the sender gets back
+        assert mock_publish.call_args.kwargs["message_data"] == response.json()
 
 
 @pytest.mark.asyncio
 async def test_centrifugo_disconnect_user_method():
-    """Test that disconnect_user method exists and is callable."""
-    from token_bowl_chat_server.centrifugo_client import get_centrifugo_client
-
-    centrifugo = get_centrifugo_client()
-
-    # Verify the disconnect_user method is an AsyncMock
-    assert hasattr(centrifugo, "disconnect_user")
-    assert centrifugo.disconnect_user is not None
-
-    # Call it and verify it doesn't raise
-    await centrifugo.disconnect_user("testuser")
-
+    """Test that disconnect_user sends a disconnect request for the user."""
+    api = AsyncMock(spec=AsyncClient)
+    client = CentrifugoClient(api_url="", api_key="", token_secret="test-secret", client=api)
 
-def test_centrifugo_token_includes_user_info(client, registered_user):
-    """Test that Centrifugo tokens contain correct user information."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-    response = client.get("/centrifugo/connection-token", headers=headers)
+    await client.disconnect_user("testuser")
 
-    assert response.status_code == 200
-    data = response.json()
-    token = data["token"]
-
-    # Decode and verify claims
-    decoded = jwt.decode(token, "your-secret-key-change-in-production", algorithms=["HS256"])
-
-    # Verify user identifier
-    assert decoded["sub"] == "test_user"
-
-    # Verify token expiration is in the future
-    assert decoded["exp"] > decoded["iat"]
-
-    # Verify token is valid for reasonable duration (should be ~24 hours)
-    duration_seconds = decoded["exp"] - decoded["iat"]
-    assert 23 * 3600 < duration_seconds < 25 * 3600  # Between 23-25 hours
+    api.disconnect.assert_awaited_once()
+    (request,) = api.disconnect.await_args.args
+    assert request.user == "testuser"
 
 
-def test_multiple_users_get_different_tokens(client, registered_user, registered_user2):
+@pytest.mark.asyncio
+async def test_multiple_users_get_different_tokens(
+    asgi_client, jwt_cfg, token_bundle, registered_user2
+):
     """Test that different users get different connection tokens."""
-    headers1 = {"X-API-Key": registered_user["api_key"]}
-    response1 = client.get("/centrifugo/connection-token", headers=headers1)
+    data1, decoded1 = token_bundle
 
     headers2 = {"X-API-Key": registered_user2["api_key"]}
-    response2 = client.get("/centrifugo/connection-token", headers=headers2)
+    response2 = await asgi_client.get("/centrifugo/connection-token", headers=headers2)
 
-    assert response1.status_code == 200
     assert response2.status_code == 200
 
-    token1 = response1.json()["token"]
+    token1 = data1["token"]
     token2 = response2.json()["token"]
 
     # Tokens should be different
     assert token1 != token2
 
     # Decode and verify they're for different users
-    decoded1 = jwt.decode(token1, "your-secret-key-change-in-production", algorithms=["HS256"])
-    decoded2 = jwt.decode(token2, "your-secret-key-change-in-production", algorithms=["HS256"])
+    decoded2 = jwt_cfg.decode_claims(token2)
 
     assert decoded1["sub"] == "test_user"
     assert decoded2["sub"] == "test_user2"
@@ -1,44 +1,153 @@
 """Tests for conversation functionality."""
 
+import sqlite3
+
 import pytest
 
+from token_bowl_chat_server import api as api_module
+from token_bowl_chat_server import auth as auth_module
+from token_bowl_chat_server import storage as storage_module
+from token_bowl_chat_server.models import Conversation, Message, MessageType
+from token_bowl_chat_server.storage import ChatStorage
 
-@pytest.fixture
-def registered_viewer(client):
-    """Register a viewer user."""
-    response = client.post(
-        "/register",
-        json={"username": "viewer_user", "viewer": True},
-    )
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(scope="module")
+def test_storage():
+    """Share one in-memory storage across the module instead of one per test."""
+    module_storage = ChatStorage(db_path=":memory:")
+
+    original_storage = storage_module.storage
+    storage_module.storage = module_storage
+    api_module.storage = module_storage
+    auth_module.storage = module_storage
+
+    yield module_storage
+
+    storage_module.storage = original_storage
+    api_module.storage = original_storage
+    auth_module.storage = original_storage
+
+
+def _register(client, **registration):
+    response = client.post("/register", json=registration)
     assert response.status_code == 201
     return response.json()
 
 
-def test_create_conversation_rest(client, registered_user):
+@pytest.fixture(scope="module")
+def registered_user(client, test_storage):
+    """Register the test user once for the module."""
+    return _register(client, username="test_user", webhook_url=None)
+
+
+@pytest.fixture(scope="module")
+def registered_user2(client, test_storage):
+    """Register the second test user once for the module."""
+    return _register(client, username="test_user2", webhook_url=None)
+
+
+@pytest.fixture(scope="module")
+def registered_admin(client, test_storage):
+    """Register the admin user once for the module."""
+    return _register(client, username="admin_user", webhook_url=None, admin=True)
+
+
+@pytest.fixture(scope="module")
+def registered_viewer(client, test_storage):
+    """Register the read-only viewer once for the module."""
+    return _register(client, username="viewer_user", viewer=True)
+
+
+@pytest.fixture(scope="module")
+def seeded_snapshot(
+    test_storage, registered_user, registered_user2, registered_admin, registered_viewer
+):
+    """Copy of the database taken right after the module's users were registered."""
+    snapshot = sqlite3.connect(":memory:")
+    with test_storage._get_connection() as conn:
+        conn.backup(snapshot)
+    yield snapshot
+    snapshot.close()
+
+
+@pytest.fixture(autouse=True)
+def rollback_storage(test_storage, seeded_snapshot):
+    """Roll the database back to the seeded users after each test.
+
+    SQLite's backup API restores the whole in-memory database in one step,
+    which works even though ChatStorage commits after every write (so a
+    SAVEPOINT around the test would not survive).
+    """
+    yield
+    with test_storage._get_connection() as conn:
+        seeded_snapshot.backup(conn)
+
+
+async def post_json(asgi_client, path, body, api_key):
+    """POST a JSON body as the given user, assert it succeeded and return the parsed reply."""
+    response = await asgi_client.post(path, json=body, headers={"X-API-Key": api_key})
+    assert response.is_success, response.text
+    return response.json()
+
+
+async def create_messages(asgi_client, api_key, n):
+    """Send n room messages in one bulk request and return their IDs."""
+    messages = [{"content": f"Test message {i + 1}"} for i in range(n)]
+    created = await post_json(asgi_client, "/messages/bulk", {"messages": messages}, api_key)
+    return [message["id"] for message in created]
+
+
+async def create_message(asgi_client, api_key, content="Test message"):
+    """Send a room message and return its ID."""
+    return (await post_json(asgi_client, "/messages", {"content": content}, api_key))["id"]
+
+
+async def create_conversation(asgi_client, api_key, message_ids, **fields):
+    """Create a conversation from the given messages and return its ID."""
+    body = {"message_ids": message_ids, **fields}
+    return (await post_json(asgi_client, "/conversations", body, api_key))["id"]
+
+
+@pytest.fixture
+def conversation(request, test_storage, registered_user):
+    """A conversation owned by registered_user, holding a single room message.
+
+    It is written straight to storage: the tests using it cover reading, updating
+    and deleting, while creation over HTTP has tests of its own. Parametrize it
+    indirectly with a dict to set extra fields such as ``description``.
+    """
+    message = Message(
+        from_username=registered_user["username"],
+        content="Test message",
+        message_type=MessageType.ROOM,
+    )
+    test_storage.add_message(message)
+    seeded = Conversation(
+        title="Test Conversation",
+        message_ids=[message.id],
+        created_by_username=registered_user["username"],
+        **getattr(request, "param", {}),
+    )
+    test_storage.add_conversation(seeded)
+    return {
+        "id": str(seeded.id),
+        "title": seeded.title,
+        "message_id": str(message.id),
+        "api_key": registered_user["api_key"],
+        "username": registered_user["username"],
+    }
+
+
+async def test_create_conversation_rest(asgi_client, registered_user):
     """Test creating a conversation via REST API."""
     # First, create some messages
     api_key = registered_user["api_key"]
-
-    # Send a room message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message 1"},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    message1_id = response.json()["id"]
-
-    # Send another room message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message 2"},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    message2_id = response.json()["id"]
+    message1_id, message2_id = await create_messages(asgi_client, api_key, 2)
 
     # Create a conversation
-    response = client.post(
+    response = await asgi_client.post(
         "/conversations",
         json={
             "title": "Test Conversation",
@@ -55,21 +164,15 @@ def test_create_conversation_rest(client, registered_user):
     assert data["created_by_username"] == registered_user["username"]
 
 
-def test_create_conversation_without_title_rest(client, registered_user):
+async def test_create_conversation_without_title_rest(asgi_client, registered_user):
     """Test creating a conversation without a title via REST API."""
     api_key = registered_user["api_key"]
 
     # Send a room message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    message_id = response.json()["id"]
+    message_id = await create_message(asgi_client, api_key)
 
     # Create a conversation without a title
-    response = client.post(
+    response = await asgi_client.post(
         "/conversations",
         json={"message_ids": [message_id]},
         headers={"X-API-Key": api_key},
@@ -80,12 +183,12 @@ def test_create_conversation_without_title_rest(client, registered_user):
     assert len(data["message_ids"]) == 1
 
 
-def test_create_conversation_with_invalid_message_id_rest(client, registered_user):
+async def test_create_conversation_with_invalid_message_id_rest(asgi_client, registered_user):
     """Test creating a conversation with invalid message ID via REST API."""
     api_key = registered_user["api_key"]
 
     # Try to create a conversation with a non-existent message ID
-    response = client.post(
+    response = await asgi_client.post(
         "/conversations",
         json={
             "title": "Test Conversation",
@@ -96,33 +199,19 @@ def test_create_conversation_with_invalid_message_id_rest(client, registered_use
     assert response.status_code == 404
 
 
-def test_get_conversations_rest(client, registered_user):
+async def test_get_conversations_rest(asgi_client, registered_user):
     """Test getting all conversations via REST API."""
     api_key = registered_user["api_key"]
 
     # Send a room message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    message_id = response.json()["id"]
+    message_id = await create_message(asgi_client, api_key)
 
     # Create two conversations
-    client.post(
-        "/conversations",
-        json={"title": "Conversation 1", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key},
-    )
-    client.post(
-        "/conversations",
-        json={"title": "Conversation 2", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key},
-    )
+    await create_conversation(asgi_client, api_key, [message_id], title="Conversation 1")
+    await create_conversation(asgi_client, api_key, [message_id], title="Conversation 2")
 
     # Get all conversations
-    response = client.get(
+    response = await asgi_client.get(
         "/conversations",
         headers={"X-API-Key": api_key},
     )
@@ -132,96 +221,79 @@ def test_get_conversations_rest(client, registered_user):
     assert data["pagination"]["total"] == 2
 
 
-def test_get_conversation_rest(client, registered_user):
+async def test_get_conversation_rest(asgi_client, conversation):
     """Test getting a specific conversation via REST API."""
-    api_key = registered_user["api_key"]
-
-    # Send a room message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    message_id = response.json()["id"]
-
-    # Create a conversation
-    response = client.post(
-        "/conversations",
-        json={"title": "Test Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key},
-    )
-    conversation_id = response.json()["id"]
-
-    # Get the conversation
-    response = client.get(
-        f"/conversations/{conversation_id}",
-        headers={"X-API-Key": api_key},
+    response = await asgi_client.get(
+        f"/conversations/{conversation['id']}",
+        headers={"X-API-Key": conversation["api_key"]},
     )
     assert response.status_code == 200
     data = response.json()
-    assert data["id"] == conversation_id
+    assert data["id"] == conversation["id"]
     assert data["title"] == "Test Conversation"
 
 
-def test_get_conversation_unauthorized_rest(client, registered_user, registered_user2):
-    """Test that users can't view other users' conversations via REST API."""
-    api_key1 = registered_user["api_key"]
-    api_key2 = registered_user2["api_key"]
+@pytest.mark.parametrize(
+    ("actor", "method", "path", "body", "expected_status"),
+    [
+        ("registered_viewer", "GET", "/conversations/{id}", None, 200),
+        ("registered_user2", "GET", "/conversations/{id}", None, 403),
+        ("registered_user2", "PATCH", "/conversations/{id}", {"title": "Hacked Title"}, 403),
+        ("registered_user2", "DELETE", "/conversations/{id}", None, 403),
+        ("registered_user2", "DELETE", "/admin/conversations/{id}", None, 403),
+        ("registered_admin", "DELETE", "/admin/conversations/{id}", None, 204),
+    ],
+    ids=[
+        "viewer_can_view",
+        "other_user_cannot_view",
+        "other_user_cannot_update",
+        "other_user_cannot_delete",
+        "non_admin_cannot_admin_delete",
+        "admin_can_admin_delete",
+    ],
+)
+async def test_conversation_access_by_role_rest(
+    request, asgi_client, conversation, actor, method, path, body, expected_status
+):
+    """Test what each role may do with a conversation owned by another user."""
+    api_key = request.getfixturevalue(actor)["api_key"]
 
-    # User 1 sends a message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key1},
+    response = await asgi_client.request(
+        method,
+        path.format(id=conversation["id"]),
+        json=body,
+        headers={"X-API-Key": api_key},
     )
-    message_id = response.json()["id"]
+    assert response.status_code == expected_status
 
-    # User 1 creates a conversation
-    response = client.post(
-        "/conversations",
-        json={"title": "Test Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key1},
-    )
-    conversation_id = response.json()["id"]
+    if method == "GET" and expected_status == 200:
+        data = response.json()
+        assert data["id"] == conversation["id"]
+        assert data["title"] == conversation["title"]
 
-    # User 2 tries to get the conversation
-    response = client.get(
-        f"/conversations/{conversation_id}",
-        headers={"X-API-Key": api_key2},
-    )
-    assert response.status_code == 403
+    if method == "DELETE" and expected_status == 204:
+        # The owner should no longer find it
+        response = await asgi_client.get(
+            f"/conversations/{conversation['id']}",
+            headers={"X-API-Key": conversation["api_key"]},
+        )
+        assert response.status_code == 404
 
 
-def test_update_conversation_rest(client, registered_user):
+async def test_update_conversation_rest(asgi_client, registered_user):
     """Test updating a conversation via REST API."""
     api_key = registered_user["api_key"]
 
     # Send two messages
-    response = client.post(
-        "/messages",
-        json={"content": "Test message 1"},
-        headers={"X-API-Key": api_key},
-    )
-    message1_id = response.json()["id"]
-
-    response = client.post(
-        "/messages",
-        json={"content": "Test message 2"},
-        headers={"X-API-Key": api_key},
-    )
-    message2_id = response.json()["id"]
+    message1_id, message2_id = await create_messages(asgi_client, api_key, 2)
 
     # Create a conversation
-    response = client.post(
-        "/conversations",
-        json={"title": "Original Title", "message_ids": [message1_id]},
-        headers={"X-API-Key": api_key},
+    conversation_id = await create_conversation(
+        asgi_client, api_key, [message1_id], title="Original Title"
     )
-    conversation_id = response.json()["id"]
 
     # Update the conversation
-    response = client.patch(
+    response = await asgi_client.patch(
         f"/conversations/{conversation_id}",
         json={"title": "Updated Title", "message_ids": [message1_id, message2_id]},
         headers={"X-API-Key": api_key},
@@ -232,31 +304,12 @@ def test_update_conversation_rest(client, registered_user):
     assert len(data["message_ids"]) == 2
 
 
-def test_update_conversation_title_only_rest(client, registered_user):
+async def test_update_conversation_title_only_rest(asgi_client, conversation):
     """Test updating only the title of a conversation via REST API."""
-    api_key = registered_user["api_key"]
-
-    # Send a message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    message_id = response.json()["id"]
-
-    # Create a conversation
-    response = client.post(
-        "/conversations",
-        json={"title": "Original Title", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key},
-    )
-    conversation_id = response.json()["id"]
-
-    # Update only the title
-    response = client.patch(
-        f"/conversations/{conversation_id}",
+    response = await asgi_client.patch(
+        f"/conversations/{conversation['id']}",
         json={"title": "New Title"},
-        headers={"X-API-Key": api_key},
+        headers={"X-API-Key": conversation["api_key"]},
     )
     assert response.status_code == 200
     data = response.json()
@@ -264,102 +317,21 @@ def test_update_conversation_title_only_rest(client, registered_user):
     assert len(data["message_ids"]) == 1
 
 
-def test_update_conversation_unauthorized_rest(client, registered_user, registered_user2):
-    """Test that users can't update other users' conversations via REST API."""
-    api_key1 = registered_user["api_key"]
-    api_key2 = registered_user2["api_key"]
-
-    # User 1 sends a message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key1},
-    )
-    message_id = response.json()["id"]
-
-    # User 1 creates a conversation
-    response = client.post(
-        "/conversations",
-        json={"title": "Test Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key1},
-    )
-    conversation_id = response.json()["id"]
-
-    # User 2 tries to update the conversation
-    response = client.patch(
-        f"/conversations/{conversation_id}",
-        json={"title": "Hacked Title"},
-        headers={"X-API-Key": api_key2},
-    )
-    assert response.status_code == 403
-
-
-def test_delete_conversation_rest(client, registered_user):
+async def test_delete_conversation_rest(asgi_client, conversation):
     """Test deleting a conversation via REST API."""
-    api_key = registered_user["api_key"]
-
-    # Send a message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    message_id = response.json()["id"]
-
-    # Create a conversation
-    response = client.post(
-        "/conversations",
-        json={"title": "Test Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key},
-    )
-    conversation_id = response.json()["id"]
+    headers = {"X-API-Key": conversation["api_key"]}
 
     # Delete the conversation
-    response = client.delete(
-        f"/conversations/{conversation_id}",
-        headers={"X-API-Key": api_key},
-    )
+    response = await asgi_client.delete(f"/conversations/{conversation['id']}", headers=headers)
     assert response.status_code == 204
 
     # Verify it's deleted
-    response = client.get(
-        f"/conversations/{conversation_id}",
-        headers={"X-API-Key": api_key},
-    )
+    response = await asgi_client.get(f"/conversations/{conversation['id']}", headers=headers)
     assert response.status_code == 404
 
 
-def test_delete_conversation_unauthorized_rest(client, registered_user, registered_user2):
-    """Test that users can't delete other users' conversations via REST API."""
-    api_key1 = registered_user["api_key"]
-    api_key2 = registered_user2["api_key"]
-
-    # User 1 sends a message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key1},
-    )
-    message_id = response.json()["id"]
-
-    # User 1 creates a conversation
-    response = client.post(
-        "/conversations",
-        json={"title": "Test Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key1},
-    )
-    conversation_id = response.json()["id"]
-
-    # User 2 tries to delete the conversation
-    response = client.delete(
-        f"/conversations/{conversation_id}",
-        headers={"X-API-Key": api_key2},
-    )
-    assert response.status_code == 403
-
-
-def test_viewer_can_see_all_conversations_rest(
-    client, registered_user, registered_user2, registered_viewer
+async def test_viewer_can_see_all_conversations_rest(
+    asgi_client, registered_user, registered_user2, registered_viewer
 ):
     """Test that viewers can see all conversations via REST API."""
     api_key1 = registered_user["api_key"]
@@ -367,35 +339,17 @@ def test_viewer_can_see_all_conversations_rest(
     viewer_api_key = registered_viewer["api_key"]
 
     # User 1 sends a message and creates a conversation
-    response = client.post(
-        "/messages",
-        json={"content": "User 1 message"},
-        headers={"X-API-Key": api_key1},
-    )
-    message1_id = response.json()["id"]
+    message1_id = await create_message(asgi_client, api_key1, "User 1 message")
 
-    client.post(
-        "/conversations",
-        json={"title": "User 1 Conversation", "message_ids": [message1_id]},
-        headers={"X-API-Key": api_key1},
-    )
+    await create_conversation(asgi_client, api_key1, [message1_id], title="User 1 Conversation")
 
     # User 2 sends a message and creates a conversation
-    response = client.post(
-        "/messages",
-        json={"content": "User 2 message"},
-        headers={"X-API-Key": api_key2},
-    )
-    message2_id = response.json()["id"]
+    message2_id = await create_message(asgi_client, api_key2, "User 2 message")
 
-    client.post(
-        "/conversations",
-        json={"title": "User 2 Conversation", "message_ids": [message2_id]},
-        headers={"X-API-Key": api_key2},
-    )
+    await create_conversation(asgi_client, api_key2, [message2_id], title="User 2 Conversation")
 
     # Viewer should see all conversations
-    response = client.get(
+    response = await asgi_client.get(
         "/conversations",
         headers={"X-API-Key": viewer_api_key},
     )
@@ -405,7 +359,7 @@ def test_viewer_can_see_all_conversations_rest(
     assert data["pagination"]["total"] == 2
 
     # Regular user should only see their own
-    response = client.get(
+    response = await asgi_client.get(
         "/conversations",
         headers={"X-API-Key": api_key1},
     )
@@ -415,209 +369,60 @@ def test_viewer_can_see_all_conversations_rest(
     assert data["conversations"][0]["created_by_username"] == registered_user["username"]
 
 
-def test_viewer_can_see_specific_conversation_rest(client, registered_user, registered_viewer):
-    """Test that viewers can view any specific conversation via REST API."""
-    user_api_key = registered_user["api_key"]
-    viewer_api_key = registered_viewer["api_key"]
-
-    # User creates a conversation
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": user_api_key},
-    )
-    message_id = response.json()["id"]
-
-    response = client.post(
-        "/conversations",
-        json={"title": "User Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": user_api_key},
-    )
-    conversation_id = response.json()["id"]
-
-    # Viewer should be able to view it
-    response = client.get(
-        f"/conversations/{conversation_id}",
-        headers={"X-API-Key": viewer_api_key},
-    )
-    assert response.status_code == 200
-    data = response.json()
-    assert data["id"] == conversation_id
-    assert data["title"] == "User Conversation"
-
-
-def test_admin_can_delete_any_conversation_rest(client, registered_user, registered_admin):
-    """Test that admins can delete any conversation via REST API."""
-    user_api_key = registered_user["api_key"]
-    admin_api_key = registered_admin["api_key"]
-
-    # User creates a conversation
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": user_api_key},
-    )
-    message_id = response.json()["id"]
-
-    response = client.post(
-        "/conversations",
-        json={"title": "User Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": user_api_key},
-    )
-    conversation_id = response.json()["id"]
-
-    # Admin should be able to delete it using admin endpoint
-    response = client.delete(
-        f"/admin/conversations/{conversation_id}",
-        headers={"X-API-Key": admin_api_key},
-    )
-    assert response.status_code == 204
-
-    # Verify it's deleted
-    response = client.get(
-        f"/conversations/{conversation_id}",
-        headers={"X-API-Key": user_api_key},
-    )
-    assert response.status_code == 404
-
-
-def test_admin_delete_nonexistent_conversation_rest(client, registered_admin):
+async def test_admin_delete_nonexistent_conversation_rest(asgi_client, registered_admin):
     """Test that admins get 404 when deleting nonexistent conversation via REST API."""
     admin_api_key = registered_admin["api_key"]
 
     # Try to delete a non-existent conversation
-    response = client.delete(
+    response = await asgi_client.delete(
         "/admin/conversations/00000000-0000-0000-0000-000000000000",
         headers={"X-API-Key": admin_api_key},
     )
     assert response.status_code == 404
 
 
-def test_non_admin_cannot_use_admin_delete_endpoint_rest(client, registered_user, registered_user2):
-    """Test that non-admins cannot use the admin delete endpoint via REST API."""
-    user1_api_key = registered_user["api_key"]
-    user2_api_key = registered_user2["api_key"]
-
-    # User 1 creates a conversation
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": user1_api_key},
-    )
-    message_id = response.json()["id"]
-
-    response = client.post(
-        "/conversations",
-        json={"title": "User 1 Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": user1_api_key},
-    )
-    conversation_id = response.json()["id"]
-
-    # User 2 (non-admin) tries to delete it using admin endpoint
-    response = client.delete(
-        f"/admin/conversations/{conversation_id}",
-        headers={"X-API-Key": user2_api_key},
-    )
-    assert response.status_code == 403
-
-
-def test_create_conversation_with_description_rest(client, registered_user):
-    """Test creating a conversation with a description via REST API."""
+@pytest.mark.parametrize(
+    "description",
+    [None, "This is a detailed description of what this conversation is about."],
+    ids=["without_description", "with_description"],
+)
+async def test_create_conversation_description_rest(asgi_client, registered_user, description):
+    """Test creating a conversation with and without a description via REST API."""
     api_key = registered_user["api_key"]
 
     # Send a room message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    message_id = response.json()["id"]
+    message_id = await create_message(asgi_client, api_key)
 
-    # Create a conversation with description
-    response = client.post(
+    # Create a conversation, leaving description out entirely when it is None
+    body = {"title": "Test Conversation", "message_ids": [message_id]}
+    if description is not None:
+        body["description"] = description
+    response = await asgi_client.post(
         "/conversations",
-        json={
-            "title": "Test Conversation",
-            "description": "This is a detailed description of what this conversation is about.",
-            "message_ids": [message_id],
-        },
+        json=body,
         headers={"X-API-Key": api_key},
     )
     assert response.status_code == 201
     data = response.json()
     assert data["title"] == "Test Conversation"
-    assert (
-        data["description"] == "This is a detailed description of what this conversation is about."
-    )
+    assert data["description"] == description
     assert len(data["message_ids"]) == 1
 
 
-def test_create_conversation_without_description_rest(client, registered_user):
-    """Test creating a conversation without a description via REST API."""
-    api_key = registered_user["api_key"]
-
-    # Send a room message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    message_id = response.json()["id"]
-
-    # Create a conversation without description
-    response = client.post(
-        "/conversations",
-        json={
-            "title": "Test Conversation",
-            "message_ids": [message_id],
-        },
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 201
-    data = response.json()
-    assert data["title"] == "Test Conversation"
-    assert data["description"] is None
-
-
-def test_update_conversation_description_rest(client, registered_user):
-    """Test updating a conversation's description via REST API."""
-    api_key = registered_user["api_key"]
-
-    # Send a message
-    response = client.post(
-        "/messages",
-        json={"content": "Test message"},
-        headers={"X-API-Key": api_key},
-    )
-    message_id = response.json()["id"]
-
-    # Create a conversation without description
-    response = client.post(
-        "/conversations",
-        json={"title": "Test Conversation", "message_ids": [message_id]},
-        headers={"X-API-Key": api_key},
-    )
-    conversation_id = response.json()["id"]
-
-    # Update to add description
-    response = client.patch(
-        f"/conversations/{conversation_id}",
-        json={"description": "This conversation now has a description."},
-        headers={"X-API-Key": api_key},
-    )
-    assert response.status_code == 200
-    data = response.json()
-    assert data["description"] == "This conversation now has a description."
-    assert data["title"] == "Test Conversation"
-
-    # Update description to a new value
-    response = client.patch(
-        f"/conversations/{conversation_id}",
+@pytest.mark.parametrize(
+    "conversation",
+    [{}, {"description": "This conversation already has a description."}],
+    ids=["add_description", "replace_description"],
+    indirect=True,
+)
+async def test_update_conversation_description_rest(asgi_client, conversation):
+    """Test adding or replacing a conversation's description via REST API."""
+    response = await asgi_client.patch(
+        f"/conversations/{conversation['id']}",
         json={"description": "Updated description text."},
-        headers={"X-API-Key": api_key},
+        headers={"X-API-Key": conversation["api_key"]},
     )
     assert response.status_code == 200
     data = response.json()
     assert data["description"] == "Updated description text."
+    assert data["title"] == "Test Conversation"
@@ -1,15 +1,18 @@
 """Tests for Role-Based Access Control (RBAC) system."""
 
+from collections.abc import Callable
+
+import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
+from token_bowl_chat_server.models import Permission, Role, User
+
 
 def test_role_assignment_by_admin(
-    client: TestClient, registered_user: dict, registered_admin: dict
+    client: TestClient, registered_user: dict, admin_headers: dict
 ) -> None:
     """Test that admins can assign roles to users."""
-    admin_headers = {"X-API-Key": registered_admin["api_key"]}
-
     # Assign viewer role
     response = client.patch(
         f"/admin/users/{registered_user['id']}/role",
@@ -25,44 +28,40 @@ def test_role_assignment_by_admin(
 
 
 def test_role_assignment_by_non_admin(
-    client: TestClient, registered_user: dict, registered_user2: dict
+    client: TestClient, auth_headers: dict, registered_user2: dict
 ) -> None:
     """Test that non-admins cannot assign roles."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-
     response = client.patch(
         f"/admin/users/{registered_user2['id']}/role",
         json={"role": "admin"},
-        headers=headers,
+        headers=auth_headers,
     )
 
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
+@pytest.mark.parametrize("role", ["admin", "member", "viewer", "bot"])
 def test_assign_all_roles(
-    client: TestClient, registered_user: dict, registered_admin: dict
+    client: TestClient, registered_user: dict, admin_headers: dict, role: str
 ) -> None:
     """Test assigning each role type."""
-    admin_headers = {"X-API-Key": registered_admin["api_key"]}
-
-    for role in ["admin", "member", "viewer", "bot"]:
-        response = client.patch(
-            f"/admin/users/{registered_user['id']}/role",
-            json={"role": role},
-            headers=admin_headers,
-        )
-        assert response.status_code == status.HTTP_200_OK
-        assert response.json()["role"] == role
+    response = client.patch(
+        f"/admin/users/{registered_user['id']}/role",
+        json={"role": role},
+        headers=admin_headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["role"] == role
 
 
-def test_member_can_create_bot(client: TestClient, registered_user: dict) -> None:
+def test_member_can_create_bot(
+    client: TestClient, registered_user: dict, auth_headers: dict
+) -> None:
     """Test that members have CREATE_BOT permission."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-
     response = client.post(
         "/bots",
         json={"username": "member_bot", "emoji": "🤖"},
-        headers=headers,
+        headers=auth_headers,
     )
 
     assert response.status_code == status.HTTP_201_CREATED
@@ -71,14 +70,10 @@ def test_member_can_create_bot(client: TestClient, registered_user: dict) -> Non
     assert data["created_by"] == registered_user["username"]
 
 
-def test_viewer_cannot_create_bot(client: TestClient) -> None:
+def test_viewer_cannot_create_bot(client: TestClient, make_user: Callable[..., User]) -> None:
     """Test that viewers don't have CREATE_BOT permission."""
-    # Register a viewer
-    viewer_response = client.post(
-        "/register",
-        json={"username": "viewer_user", "viewer": True},
-    )
-    viewer_headers = {"X-API-Key": viewer_response.json()["api_key"]}
+    viewer = make_user("viewer_user", role=Role.VIEWER)
+    viewer_headers = {"X-API-Key": viewer.api_key}
 
     # Try to create a bot
     response = client.post(
@@ -91,69 +86,59 @@ def test_viewer_cannot_create_bot(client: TestClient) -> None:
 
 
 def test_member_can_send_direct_messages(
-    client: TestClient, registered_user: dict, registered_user2: dict
+    client: TestClient, auth_headers: dict, registered_user2: dict
 ) -> None:
     """Test that members have SEND_DIRECT_MESSAGE permission."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-
     response = client.post(
         "/messages",
         json={"content": "Hello!", "to_username": registered_user2["username"]},
-        headers=headers,
+        headers=auth_headers,
     )
 
     assert response.status_code == status.HTTP_201_CREATED
     assert response.json()["message_type"] == "direct"
 
 
-def test_member_can_send_room_messages(client: TestClient, registered_user: dict) -> None:
+def test_member_can_send_room_messages(client: TestClient, auth_headers: dict) -> None:
     """Test that members have SEND_ROOM_MESSAGE permission."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-
     response = client.post(
         "/messages",
         json={"content": "Hello room!"},
-        headers=headers,
+        headers=auth_headers,
     )
 
     assert response.status_code == status.HTTP_201_CREATED
     assert response.json()["message_type"] == "room"
 
 
-def test_member_can_update_own_profile(client: TestClient, registered_user: dict) -> None:
+def test_member_can_update_own_profile(client: TestClient, auth_headers: dict) -> None:
     """Test that members have UPDATE_OWN_PROFILE permission."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-
     response = client.patch(
         "/users/me/logo",
         json={"logo": "claude-color.png"},
-        headers=headers,
+        headers=auth_headers,
     )
 
     assert response.status_code == status.HTTP_200_OK
 
 
 def test_member_cannot_update_any_user(
-    client: TestClient, registered_user: dict, registered_user2: dict
+    client: TestClient, auth_headers: dict, registered_user2: dict
 ) -> None:
     """Test that members don't have UPDATE_ANY_USER permission."""
-    headers = {"X-API-Key": registered_user["api_key"]}
-
     response = client.patch(
         f"/admin/users/{registered_user2['id']}",
         json={"email": "hacked@example.com"},
-        headers=headers,
+        headers=auth_headers,
     )
 
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
 def test_admin_has_all_permissions(
-    client: TestClient, registered_user: dict, registered_admin: dict
+    client: TestClient, registered_user: dict, admin_headers: dict
 ) -> None:
     """Test that admins have all permissions."""
-    admin_headers = {"X-API-Key": registered_admin["api_key"]}
-
     # Can create bot
     response = client.post(
         "/bots",
@@ -179,14 +164,10 @@ def test_admin_has_all_permissions(
     assert response.status_code == status.HTTP_204_NO_CONTENT
 
 
-def test_viewer_can_only_read(client: TestClient) -> None:
+def test_viewer_can_only_read(client: TestClient, make_user: Callable[..., User]) -> None:
     """Test that viewers only have read permissions."""
-    # Register a viewer
-    viewer_response = client.post(
-        "/register",
-        json={"username": "viewer_readonly", "viewer": True},
-    )
-    viewer_headers = {"X-API-Key": viewer_response.json()["api_key"]}
+    viewer = make_user("viewer_readonly", role=Role.VIEWER)
+    viewer_headers = {"X-API-Key": viewer.api_key}
 
     # Can read messages
     response = client.get("/messages", headers=viewer_headers)
@@ -213,15 +194,14 @@ def test_viewer_can_only_read(client: TestClient) -> None:
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
-def test_bot_permissions(client: TestClient, registered_user: dict) -> None:
+def test_bot_permissions(
+    client: TestClient, registered_user: dict, make_user: Callable[..., User]
+) -> None:
     """Test that bots have correct permissions."""
-    # Create a bot
-    bot_response = client.post(
-        "/bots",
-        json={"username": "test_bot_permissions", "emoji": "🤖"},
-        headers={"X-API-Key": registered_user["api_key"]},
+    bot = make_user(
+        "test_bot_permissions", role=Role.BOT, created_by=registered_user["id"], emoji="🤖"
     )
-    bot_headers = {"X-API-Key": bot_response.json()["api_key"]}
+    bot_headers = {"X-API-Key": bot.api_key}
 
     # Can read messages
     response = client.get("/messages", headers=bot_headers)
@@ -257,12 +237,9 @@ def test_bot_permissions(client: TestClient, registered_user: dict) -> None:
 
 
 def test_role_persistence_after_update(
-    client: TestClient, registered_user: dict, registered_admin: dict
+    client: TestClient, registered_user: dict, auth_headers: dict, admin_headers: dict
 ) -> None:
     """Test that role changes persist across requests."""
-    admin_headers = {"X-API-Key": registered_admin["api_key"]}
-    user_headers = {"X-API-Key": registered_user["api_key"]}
-
     # Initially user is a member and can send DMs
     # (already tested above, but let's verify)
 
@@ -278,7 +255,7 @@ def test_role_persistence_after_update(
     response = client.post(
         "/messages",
         json={"content": "This should fail"},
-        headers=user_headers,
+        headers=auth_headers,
     )
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
@@ -294,7 +271,7 @@ def test_role_persistence_after_update(
     response = client.post(
         "/messages",
         json={"content": "This should work"},
-        headers=user_headers,
+        headers=auth_headers,
     )
     assert response.status_code == status.HTTP_201_CREATED
 
@@ -317,11 +294,9 @@ def test_legacy_fields_sync_with_role(client: TestClient) -> None:
 
 
 def test_invalid_role_assignment(
-    client: TestClient, registered_user: dict, registered_admin: dict
+    client: TestClient, registered_user: dict, admin_headers: dict
 ) -> None:
     """Test that invalid role assignment fails."""
-    admin_headers = {"X-API-Key": registered_admin["api_key"]}
-
     response = client.patch(
         f"/admin/users/{registered_user['id']}/role",
         json={"role": "super_admin"},  # Invalid role
@@ -331,10 +306,8 @@ def test_invalid_role_assignment(
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
 
-def test_role_assignment_to_nonexistent_user(client: TestClient, registered_admin: dict) -> None:
+def test_role_assignment_to_nonexistent_user(client: TestClient, admin_headers: dict) -> None:
     """Test that assigning role to non-existent user fails."""
-    admin_headers = {"X-API-Key": registered_admin["api_key"]}
-
     response = client.patch(
         "/admin/users/00000000-0000-0000-0000-000000000000/role",
         json={"role": "admin"},
@@ -342,3 +315,16 @@ def test_role_assignment_to_nonexistent_user(client: TestClient, registered_admi
     )
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.parametrize("role", list(Role))
+def test_has_any_permission_matches_has_permission(role: Role) -> None:
+    """Test that the any-of check agrees with the single-permission check."""
+    user = User(username="perm_user", api_key="p" * 32, role=role)
+
+    for permission in Permission:
+        assert user.has_any_permission(frozenset({permission})) is user.has_permission(permission)
+    assert user.has_any_permission(frozenset(Permission)) is any(
+        user.has_permission(permission) for permission in Permission
+    )
+    assert user.has_any_permission(frozenset()) is False
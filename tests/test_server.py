@@ -9,12 +9,10 @@ from token_bowl_chat_server.server import create_app, lifespan
 
 
 @pytest.mark.asyncio
-async def test_lifespan_startup_and_shutdown():
+async def test_lifespan_startup_and_shutdown(app):
     """Test that the lifespan context manager starts and stops webhook delivery."""
     from token_bowl_chat_server import webhook
 
-    app = create_app()
-
     # Mock webhook_delivery start and stop methods
     with (
         patch.object(webhook.webhook_delivery, "start", new_callable=AsyncMock) as mock_start,
@@ -30,10 +28,8 @@ async def test_lifespan_startup_and_shutdown():
 
 
 @pytest.mark.asyncio
-async def test_create_app():
+async def test_create_app(app):
     """Test that create_app creates a properly configured FastAPI app."""
-    app = create_app()
-
     assert app.title == "Token Bowl Chat Server"
     assert app.version == "0.1.0"
     assert "A chat server designed for large language model consumption" in app.description
@@ -76,3 +72,24 @@ def test_static_files_not_served_in_production():
         assert response.status_code == 404
     finally:
         config.settings.reload = original_reload
+
+
+def test_static_files_app_built_once():
+    """Test that dev-mode apps share a single StaticFiles instance."""
+    from token_bowl_chat_server import config
+
+    original_reload = config.settings.reload
+    config.settings.reload = True
+
+    try:
+        mounts = [
+            next(
+                route.app
+                for route in create_app().routes
+                if getattr(route, "path", "") == "/public"
+            )
+            for _ in range(2)
+        ]
+        assert mounts[0] is mounts[1]
+    finally:
+        config.settings.reload = original_reload
@@ -1,5 +1,7 @@
 """Tests for storage module."""
 
+import sqlite3
+import threading
 from datetime import UTC, datetime, timedelta
 
 import pytest
@@ -19,6 +21,84 @@ def test_add_user():
     assert storage.get_user_by_api_key("a" * 32) == user
 
 
+def test_in_memory_storage_pragmas():
+    """Test that in-memory storage skips durability work it doesn't need."""
+    storage = ChatStorage(db_path=":memory:")
+
+    with storage._get_connection() as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+
+
+def test_in_memory_storages_are_independent():
+    """Test that in-memory storages copied from the schema template share no data."""
+    storage1 = ChatStorage(db_path=":memory:")
+    storage2 = ChatStorage(db_path=":memory:")
+
+    storage1.add_user(User(username="only_here", api_key="e" * 32))
+
+    assert storage1.get_user_by_username("only_here") is not None
+    assert storage2.get_user_by_username("only_here") is None
+    assert storage2.get_all_users() == []
+
+
+@pytest.fixture
+def file_storage(tmp_path):
+    """Create a migrated file-backed storage, closed again after the test."""
+    storage = ChatStorage(db_path=str(tmp_path / "chat.db"))
+    yield storage
+    storage.close()
+
+
+def test_file_storage_reuses_connection_per_thread(file_storage):
+    """Test that a thread gets the same connection on every call."""
+    with file_storage._get_connection() as first:
+        pass
+    with file_storage._get_connection() as second:
+        assert second is first
+
+
+def test_file_storage_rolls_back_uncommitted_writes(file_storage):
+    """Test that leaving the connection context drops an uncommitted write."""
+    file_storage.add_user(User(username="kept", api_key="f" * 32))
+
+    with file_storage._get_connection() as conn:
+        conn.execute("DELETE FROM users")
+        assert conn.in_transaction
+
+    assert not conn.in_transaction
+    assert file_storage.get_user_by_username("kept") is not None
+
+
+def test_file_storage_connections_per_thread_closed(file_storage):
+    """Test that each thread gets its own connection and close() closes them all."""
+    with file_storage._get_connection() as main_conn:
+        pass
+
+    other_conns = []
+
+    def use_storage() -> None:
+        with file_storage._get_connection() as conn:
+            other_conns.append(conn)
+
+    thread = threading.Thread(target=use_storage)
+    thread.start()
+    thread.join()
+
+    (other_conn,) = other_conns
+    assert other_conn is not main_conn
+
+    file_storage.close()
+
+    for conn in (main_conn, other_conn):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    # A closed file storage reconnects on next use
+    assert file_storage.get_all_users() == []
+
+
 def test_add_duplicate_username():
     """Test that adding duplicate username raises error."""
     storage = ChatStorage(db_path=":memory:")
@@ -89,18 +169,43 @@ def test_add_message():
     assert messages[0].from_username == message.from_username
 
 
-def test_message_history_limit():
-    """Test that message history is limited."""
-    storage = ChatStorage(db_path=":memory:", message_history_limit=5)
-
-    # Add more messages than the limit
-    for i in range(10):
-        message = Message(
+def test_add_messages():
+    """Test adding several messages at once."""
+    storage = ChatStorage(db_path=":memory:", message_history_limit=3)
+    messages = [
+        Message(
             from_username="user",
             content=f"Message {i}",
             message_type=MessageType.ROOM,
+            timestamp=datetime.now(UTC) + timedelta(seconds=i),
         )
-        storage.add_message(message)
+        for i in range(4)
+    ]
+
+    storage.add_messages(messages)
+
+    # History limit still applies to the whole batch
+    stored = storage.get_recent_messages(limit=10)
+    assert [m.content for m in stored] == ["Message 3", "Message 2", "Message 1"]
+
+
+def test_message_history_limit():
+    """Test that message history is limited."""
+    storage = ChatStorage(db_path=":memory:", message_history_limit=5)
+
+    # Add more messages than the limit, one second apart so trimming is deterministic
+    now = datetime.now(UTC)
+    storage.add_messages(
+        [
+            Message(
+                from_username="user",
+                content=f"Message {i}",
+                message_type=MessageType.ROOM,
+                timestamp=now + timedelta(seconds=i),
+            )
+            for i in range(10)
+        ]
+    )
 
     # Should only keep the last 5 (newest first)
     messages = storage.get_recent_messages(limit=100)
@@ -114,13 +219,16 @@ def test_get_recent_messages():
     storage = ChatStorage(db_path=":memory:")
 
     # Add room messages
-    for i in range(5):
-        message = Message(
-            from_username="user",
-            content=f"Room {i}",
-            message_type=MessageType.ROOM,
-        )
-        storage.add_message(message)
+    storage.add_messages(
+        [
+            Message(
+                from_username="user",
+                content=f"Room {i}",
+                message_type=MessageType.ROOM,
+            )
+            for i in range(5)
+        ]
+    )
 
     # Add direct message (should not be included)
     dm = Message(
@@ -140,13 +248,19 @@ def test_get_recent_messages_with_limit():
     """Test getting recent messages with limit and offset."""
     storage = ChatStorage(db_path=":memory:")
 
-    for i in range(10):
-        message = Message(
-            from_username="user",
-            content=f"Message {i}",
-            message_type=MessageType.ROOM,
-        )
-        storage.add_message(message)
+    # One second apart, so trimming and newest-first ordering are deterministic
+    now = datetime.now(UTC)
+    storage.add_messages(
+        [
+            Message(
+                from_username="user",
+                content=f"Message {i}",
+                message_type=MessageType.ROOM,
+                timestamp=now + timedelta(seconds=i),
+            )
+            for i in range(10)
+        ]
+    )
 
     # Get first 3 messages (default offset=0) - newest first
     messages = storage.get_recent_messages(limit=3)
@@ -324,13 +438,16 @@ def test_get_room_messages_count_with_since():
     storage.add_message(old_msg)
 
     # Add new messages
-    for i in range(3):
-        msg = Message(
-            from_username="user",
-            content=f"New {i}",
-            message_type=MessageType.ROOM,
-        )
-        storage.add_message(msg)
+    storage.add_messages(
+        [
+            Message(
+                from_username="user",
+                content=f"New {i}",
+                message_type=MessageType.ROOM,
+            )
+            for i in range(3)
+        ]
+    )
 
     # Count messages since 30 minutes ago
     count = storage.get_room_messages_count(since=now - timedelta(minutes=30))
@@ -355,15 +472,76 @@ def test_get_direct_messages_count_with_since():
     storage.add_message(old_msg)
 
     # Add new direct messages
-    for i in range(2):
-        msg = Message(
-            from_username="user1",
-            to_username="user2",
-            content=f"New DM {i}",
-            message_type=MessageType.DIRECT,
-        )
-        storage.add_message(msg)
+    storage.add_messages(
+        [
+            Message(
+                from_username="user1",
+                to_username="user2",
+                content=f"New DM {i}",
+                message_type=MessageType.DIRECT,
+            )
+            for i in range(2)
+        ]
+    )
 
     # Count messages since 30 minutes ago
     count = storage.get_direct_messages_count("user2", since=now - timedelta(minutes=30))
     assert count == 2
+
+
+def test_get_unread_count():
+    """Test unread counts split by room and direct messages."""
+    storage = ChatStorage(db_path=":memory:")
+    room = Message(from_username="user2", content="Room", message_type=MessageType.ROOM)
+    direct = Message(
+        from_username="user2",
+        to_username="user1",
+        content="Direct",
+        message_type=MessageType.DIRECT,
+    )
+    storage.add_messages(
+        [
+            room,
+            direct,
+            # Own messages and other users' DMs never count as unread
+            Message(from_username="user1", content="Mine", message_type=MessageType.ROOM),
+            Message(
+                from_username="user2",
+                to_username="user3",
+                content="Not for user1",
+                message_type=MessageType.DIRECT,
+            ),
+        ]
+    )
+
+    assert storage.get_unread_count("user1") == (1, 1, 2)
+
+    storage.mark_message_as_read(str(direct.id), "user1")
+    assert storage.get_unread_count("user1") == (1, 0, 1)
+
+    storage.mark_message_as_read(str(room.id), "user1")
+    assert storage.get_unread_count("user1") == (0, 0, 0)
+
+
+def test_mark_all_messages_as_read():
+    """Test marking every unread message as read at once."""
+    storage = ChatStorage(db_path=":memory:")
+    room = Message(from_username="user2", content="Room", message_type=MessageType.ROOM)
+    storage.add_messages(
+        [
+            room,
+            Message(
+                from_username="user2",
+                to_username="user1",
+                content="Direct",
+                message_type=MessageType.DIRECT,
+            ),
+            Message(from_username="user1", content="Mine", message_type=MessageType.ROOM),
+        ]
+    )
+    storage.mark_message_as_read(str(room.id), "user1")
+
+    # Only the direct message was still unread
+    assert storage.mark_all_messages_as_read("user1") == 1
+    assert storage.get_unread_count("user1") == (0, 0, 0)
+    assert storage.mark_all_messages_as_read("user1") == 0
@@ -1,6 +1,8 @@
 """Tests for webhook delivery module."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+from collections import Counter
+from unittest.mock import AsyncMock, patch
 
 import httpx
 import pytest
@@ -9,232 +11,145 @@ import pytest_asyncio
 from token_bowl_chat_server.models import Message, MessageType, User
 from token_bowl_chat_server.webhook import WebhookDelivery
 
+# Every test and the webhook_delivery fixture share one event loop
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-@pytest_asyncio.fixture
-async def webhook_delivery():
-    """Create a webhook delivery instance for testing."""
-    delivery = WebhookDelivery(timeout=5.0, max_retries=2)
-    await delivery.start()
-    yield delivery
-    await delivery.stop()
+API_KEY_A = "a" * 64
+API_KEY_B = "b" * 64
+API_KEY_C = "c" * 64
 
+# Delivery only reads status_code, so canned responses can be shared
+RESPONSE_OK = httpx.Response(200)
+RESPONSE_ERROR = httpx.Response(500)
 
-@pytest.mark.asyncio
-async def test_webhook_delivery_start_stop():
-    """Test starting and stopping webhook delivery."""
-    delivery = WebhookDelivery()
-    assert delivery.client is None
 
-    await delivery.start()
-    assert delivery.client is not None
-
-    await delivery.stop()
-    assert delivery.client is None
-
-
-@pytest.mark.asyncio
-async def test_deliver_message_success(webhook_delivery):
-    """Test successful message delivery."""
-    user = User(
+@pytest.fixture(scope="module")
+def sample_user() -> User:
+    """A user with a webhook, shared read-only by the tests in this module."""
+    return User(
         username="test_user",
-        api_key="a" * 64,
+        api_key=API_KEY_A,
         webhook_url="https://example.com/webhook",
     )
-    message = Message(
-        from_username="sender",
-        content="Test message",
-        message_type=MessageType.ROOM,
-    )
-
-    # Mock successful response
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
-
-        result = await webhook_delivery.deliver_message(user, message)
-
-        assert result is True
-        mock_post.assert_called_once()
 
 
-@pytest.mark.asyncio
-async def test_deliver_message_no_webhook_url(webhook_delivery):
-    """Test delivery to user without webhook URL."""
-    user = User(username="test_user", api_key="a" * 64)
-    message = Message(
-        from_username="sender",
-        content="Test message",
-        message_type=MessageType.ROOM,
-    )
-
-    result = await webhook_delivery.deliver_message(user, message)
-    assert result is False
-
-
-@pytest.mark.asyncio
-async def test_deliver_message_client_not_initialized():
-    """Test delivery when client is not initialized."""
-    delivery = WebhookDelivery()
-    user = User(
-        username="test_user",
-        api_key="a" * 64,
-        webhook_url="https://example.com/webhook",
-    )
-    message = Message(
+@pytest.fixture(scope="module")
+def sample_message() -> Message:
+    """A room message, shared read-only by the tests in this module."""
+    return Message(
         from_username="sender",
         content="Test message",
         message_type=MessageType.ROOM,
     )
 
-    result = await delivery.deliver_message(user, message)
-    assert result is False
 
+@pytest.fixture
+def webhook_hits() -> Counter[str]:
+    """Count the webhook POSTs that reach the in-memory transport, per URL."""
+    return Counter()
 
-@pytest.mark.asyncio
-async def test_deliver_message_http_error(webhook_delivery):
-    """Test delivery with HTTP error response."""
-    user = User(
-        username="test_user",
-        api_key="a" * 64,
-        webhook_url="https://example.com/webhook",
-    )
-    message = Message(
-        from_username="sender",
-        content="Test message",
-        message_type=MessageType.ROOM,
-    )
 
-    # Mock error response
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_post.return_value = mock_response
+@pytest_asyncio.fixture(loop_scope="module")
+async def webhook_delivery(webhook_hits):
+    """Create a webhook delivery instance for testing.
 
-        result = await webhook_delivery.deliver_message(user, message)
+    The in-memory transport means starting the client builds no connection
+    pool or SSL context, and every request it answers is tallied in
+    ``webhook_hits``. Retries go out back to back instead of backing off.
+    """
 
-        assert result is False
-        # Should retry (max_retries=2)
-        assert mock_post.call_count == 2
+    def handler(request: httpx.Request) -> httpx.Response:
+        webhook_hits[str(request.url)] += 1
+        return httpx.Response(200)
 
-
-@pytest.mark.asyncio
-async def test_deliver_message_timeout(webhook_delivery):
-    """Test delivery with timeout."""
-    user = User(
-        username="test_user",
-        api_key="a" * 64,
-        webhook_url="https://example.com/webhook",
-    )
-    message = Message(
-        from_username="sender",
-        content="Test message",
-        message_type=MessageType.ROOM,
+    delivery = WebhookDelivery(
+        timeout=5.0,
+        max_retries=2,
+        transport=httpx.MockTransport(handler),
+        retry_delay=0,
     )
+    await delivery.start()
+    yield delivery
+    await delivery.stop()
 
-    # Mock timeout exception
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_post.side_effect = httpx.TimeoutException("Timeout")
-
-        result = await webhook_delivery.deliver_message(user, message)
 
-        assert result is False
-        # Should retry (max_retries=2)
-        assert mock_post.call_count == 2
+@pytest.fixture
+def mock_post(webhook_delivery, monkeypatch):
+    """Replace the delivery client's POST with a mock that answers 200."""
+    mock = AsyncMock(return_value=RESPONSE_OK)
+    monkeypatch.setattr(webhook_delivery.client, "post", mock)
+    return mock
 
 
-@pytest.mark.asyncio
-async def test_deliver_message_request_error(webhook_delivery):
-    """Test delivery with request error."""
-    user = User(
-        username="test_user",
-        api_key="a" * 64,
-        webhook_url="https://example.com/webhook",
-    )
-    message = Message(
-        from_username="sender",
-        content="Test message",
-        message_type=MessageType.ROOM,
-    )
+async def test_webhook_delivery_start_stop():
+    """Test starting and stopping webhook delivery."""
+    delivery = WebhookDelivery()
+    assert delivery.client is None
 
-    # Mock request error
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_post.side_effect = httpx.RequestError("Network error")
+    await delivery.start()
+    assert delivery.client is not None
 
-        result = await webhook_delivery.deliver_message(user, message)
+    await delivery.stop()
+    assert delivery.client is None
 
-        assert result is False
-        assert mock_post.call_count == 2
 
+async def test_enqueue_delivers(webhook_delivery, webhook_hits, sample_user, sample_message):
+    """Test that a queued message is posted to the user's webhook."""
+    webhook_delivery.enqueue(sample_user, sample_message)
+    await webhook_delivery.join()
 
-@pytest.mark.asyncio
-async def test_deliver_message_unexpected_error(webhook_delivery):
-    """Test delivery with unexpected error."""
-    user = User(
-        username="test_user",
-        api_key="a" * 64,
-        webhook_url="https://example.com/webhook",
-    )
-    message = Message(
-        from_username="sender",
-        content="Test message",
-        message_type=MessageType.ROOM,
-    )
+    assert webhook_hits == {"https://example.com/webhook": 1}
 
-    # Mock unexpected error
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_post.side_effect = Exception("Unexpected error")
 
-        result = await webhook_delivery.deliver_message(user, message)
+async def test_enqueue_without_webhook_url_is_skipped(
+    webhook_delivery, sample_user, sample_message
+):
+    """Test that users without a webhook URL get no queue."""
+    user = sample_user.model_copy(update={"webhook_url": None})
 
-        assert result is False
-        assert mock_post.call_count == 2
+    webhook_delivery.enqueue(user, sample_message)
 
+    assert webhook_delivery._relays == {}
 
-@pytest.mark.asyncio
-async def test_deliver_message_retry_success(webhook_delivery):
-    """Test delivery succeeds on retry."""
-    user = User(
-        username="test_user",
-        api_key="a" * 64,
-        webhook_url="https://example.com/webhook",
-    )
-    message = Message(
-        from_username="sender",
-        content="Test message",
-        message_type=MessageType.ROOM,
-    )
 
-    # Mock first call fails, second succeeds
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_response_error = MagicMock()
-        mock_response_error.status_code = 500
-        mock_response_success = MagicMock()
-        mock_response_success.status_code = 200
-        mock_post.side_effect = [mock_response_error, mock_response_success]
+@pytest.mark.parametrize(
+    ("side_effect", "expected"),
+    [
+        ([RESPONSE_ERROR] * 2, False),
+        (httpx.TimeoutException("Timeout"), False),
+        (httpx.RequestError("Network error"), False),
+        (Exception("Unexpected error"), False),
+        ([RESPONSE_ERROR, RESPONSE_OK], True),
+    ],
+    ids=["http_error", "timeout", "request_error", "unexpected_error", "retry_success"],
+)
+async def test_post_retries(
+    webhook_delivery, mock_post, side_effect, expected, sample_user, sample_message
+):
+    """Test that failed deliveries are retried up to max_retries (2) times."""
+    mock_post.side_effect = side_effect
 
-        result = await webhook_delivery.deliver_message(user, message)
+    result = await webhook_delivery._post(sample_user, sample_message.model_dump(mode="json"))
 
-        assert result is True
-        assert mock_post.call_count == 2
+    assert result is expected
+    assert mock_post.call_count == 2
 
 
-@pytest.mark.asyncio
-async def test_broadcast_to_webhooks(webhook_delivery):
+async def test_enqueue_broadcast(webhook_delivery, webhook_hits):
     """Test broadcasting to multiple webhooks."""
     user1 = User(
         username="user1",
-        api_key="a" * 64,
+        api_key=API_KEY_A,
         webhook_url="https://example.com/webhook1",
     )
     user2 = User(
         username="user2",
-        api_key="b" * 64,
+        api_key=API_KEY_B,
         webhook_url="https://example.com/webhook2",
     )
     user3 = User(
         username="user3",
-        api_key="c" * 64,
+        api_key=API_KEY_C,
     )  # No webhook
 
     message = Message(
@@ -243,28 +158,26 @@ async def test_broadcast_to_webhooks(webhook_delivery):
         message_type=MessageType.ROOM,
     )
 
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
-
-        await webhook_delivery.broadcast_to_webhooks(message, [user1, user2, user3])
+    webhook_delivery.enqueue_broadcast(message, [user1, user2, user3])
+    await webhook_delivery.join()
 
-        # Should call post twice (user1 and user2, not user3)
-        assert mock_post.call_count == 2
+    # Should post once each to user1 and user2, not user3
+    assert webhook_hits == {
+        "https://example.com/webhook1": 1,
+        "https://example.com/webhook2": 1,
+    }
 
 
-@pytest.mark.asyncio
-async def test_broadcast_to_webhooks_with_exclusion(webhook_delivery):
+async def test_enqueue_broadcast_with_exclusion(webhook_delivery, webhook_hits):
     """Test broadcasting with username exclusion."""
     user1 = User(
         username="user1",
-        api_key="a" * 64,
+        api_key=API_KEY_A,
         webhook_url="https://example.com/webhook1",
     )
     user2 = User(
         username="user2",
-        api_key="b" * 64,
+        api_key=API_KEY_B,
         webhook_url="https://example.com/webhook2",
     )
 
@@ -274,21 +187,14 @@ async def test_broadcast_to_webhooks_with_exclusion(webhook_delivery):
         message_type=MessageType.ROOM,
     )
 
-    with patch.object(webhook_delivery.client, "post", new_callable=AsyncMock) as mock_post:
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
-
-        await webhook_delivery.broadcast_to_webhooks(
-            message, [user1, user2], exclude_username="user1"
-        )
+    webhook_delivery.enqueue_broadcast(message, [user1, user2], exclude_username="user1")
+    await webhook_delivery.join()
 
-        # Should only call post once (user2, not user1)
-        assert mock_post.call_count == 1
+    # Should only post to user2, not user1
+    assert webhook_hits == {"https://example.com/webhook2": 1}
 
 
-@pytest.mark.asyncio
-async def test_broadcast_to_webhooks_no_users(webhook_delivery):
+async def test_enqueue_broadcast_no_users(webhook_delivery):
     """Test broadcasting with no eligible users."""
     message = Message(
         from_username="sender",
@@ -296,5 +202,145 @@ async def test_broadcast_to_webhooks_no_users(webhook_delivery):
         message_type=MessageType.ROOM,
     )
 
-    # Should not raise any errors
-    await webhook_delivery.broadcast_to_webhooks(message, [])
+    webhook_delivery.enqueue_broadcast(message, [])
+
+    assert webhook_delivery._queues == {}
+
+
+async def test_enqueue_delivers_in_background_in_order(webhook_delivery, mock_post, sample_user):
+    """Test that queued deliveries run in the background, in order per user."""
+    messages = [
+        Message(from_username="sender", content=f"Message {i}", message_type=MessageType.ROOM)
+        for i in range(3)
+    ]
+
+    for message in messages:
+        webhook_delivery.enqueue(sample_user, message)
+    # Nothing is sent until the relay task gets to run
+    assert mock_post.call_count == 0
+
+    await webhook_delivery.join()
+
+    sent = [call.kwargs["json"]["content"] for call in mock_post.call_args_list]
+    assert sent == ["Message 0", "Message 1", "Message 2"]
+
+
+async def test_enqueue_drops_oldest_when_queue_full(sample_user):
+    """Test that a full per-user queue drops its oldest pending delivery."""
+    delivery = WebhookDelivery(max_retries=1, queue_size=1)
+    await delivery.start()
+
+    try:
+        with patch.object(
+            delivery.client, "post", new_callable=AsyncMock, return_value=RESPONSE_OK
+        ) as mock_post:
+            for i in range(3):
+                delivery.enqueue(
+                    sample_user,
+                    Message(from_username="sender", content=f"M{i}", message_type=MessageType.ROOM),
+                )
+            await delivery.join()
+
+            mock_post.assert_called_once()
+            assert mock_post.call_args.kwargs["json"]["content"] == "M2"
+    finally:
+        await delivery.stop()
+
+
+async def test_enqueue_without_client_is_dropped(sample_user, sample_message):
+    """Test that nothing is queued before the delivery system is started."""
+    delivery = WebhookDelivery()
+
+    delivery.enqueue(sample_user, sample_message)
+
+    assert delivery._relays == {}
+
+
+async def test_stop_cancels_relays(webhook_delivery, mock_post, sample_user, sample_message):
+    """Test that stopping the delivery system cancels the relay tasks."""
+    webhook_delivery.enqueue(sample_user, sample_message)
+    relay = webhook_delivery._relays["test_user"]
+
+    await webhook_delivery.stop()
+
+    assert relay.cancelled()
+    assert webhook_delivery._relays == {}
+
+
+async def test_relay_retires_when_idle(webhook_delivery, webhook_hits, sample_user, sample_message):
+    """Test that a drained relay exits and the next message starts a new one."""
+    webhook_delivery.enqueue(sample_user, sample_message)
+    await webhook_delivery.join()
+
+    assert webhook_delivery._relays == {}
+    assert webhook_delivery._queues == {}
+
+    webhook_delivery.enqueue(sample_user, sample_message)
+    await webhook_delivery.join()
+
+    assert webhook_hits == {"https://example.com/webhook": 2}
+
+
+async def test_stop_drains_queued_deliveries(
+    webhook_delivery, webhook_hits, sample_user, sample_message
+):
+    """Test that stopping with a drain timeout delivers what is already queued."""
+    webhook_delivery.enqueue(sample_user, sample_message)
+
+    await webhook_delivery.stop(drain_timeout=5.0)
+
+    assert webhook_hits == {"https://example.com/webhook": 1}
+
+
+async def test_stop_drops_deliveries_after_drain_timeout(
+    webhook_delivery, mock_post, sample_user, sample_message
+):
+    """Test that deliveries still pending when the drain times out are dropped."""
+
+    async def never_answers(*args, **kwargs):
+        await asyncio.Event().wait()
+
+    mock_post.side_effect = never_answers
+    webhook_delivery.enqueue(sample_user, sample_message)
+    relay = webhook_delivery._relays["test_user"]
+
+    await webhook_delivery.stop(drain_timeout=0.01)
+
+    assert relay.cancelled()
+    assert webhook_delivery._relays == {}
+
+
+async def test_enqueue_broadcast_builds_payload_once(webhook_delivery, mock_post):
+    """Test that a broadcast serializes the message once for all recipients."""
+    users = [
+        User(
+            username=f"user{i}",
+            api_key=str(i) * 64,
+            webhook_url=f"https://example.com/webhook{i}",
+        )
+        for i in range(3)
+    ]
+    message = Message(
+        from_username="sender",
+        content="Broadcast message",
+        message_type=MessageType.ROOM,
+    )
+
+    with patch.object(
+        webhook_delivery, "_payload", wraps=webhook_delivery._payload
+    ) as mock_payload:
+        webhook_delivery.enqueue_broadcast(message, users)
+        await webhook_delivery.join()
+
+        mock_payload.assert_called_once_with(message)
+        assert mock_post.call_count == 3
+
+
+async def test_global_delivery_uses_settings():
+    """Test that the shared delivery instance is configured from settings."""
+    from token_bowl_chat_server.config import settings
+    from token_bowl_chat_server.webhook import webhook_delivery
+
+    assert webhook_delivery.timeout == settings.webhook_timeout
+    assert webhook_delivery.max_retries == settings.webhook_max_retries
+    assert webhook_delivery.queue_size == settings.webhook_queue_size